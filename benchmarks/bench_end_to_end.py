@@ -0,0 +1,133 @@
+"""
+End-to-end benchmark of scope mining and dorking against local mock APIs.
+
+Runs the real H1ScopeMiner and GoogleDorker against the stand-ins in
+mock_apis.py (no credentials or quota needed) for synthetic platforms of
+10 to 10k programs, and reports throughput, requests per result and the
+cost of building dorks and serialising scopes.
+
+Usage: python benchmarks/bench_end_to_end.py [--programs 10 100 1000 10000]
+           [--latency 0.01] [--throttle-rate 0.002] [--retry-after 1]
+           [--results 30] [--workers 8]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import Config  # noqa: E402
+from dorking import GoogleDorker  # noqa: E402
+from dorking.scope_query_factory import ScopeQueryFactory  # noqa: E402
+from metrics import MetricsRegistry  # noqa: E402
+from mock_apis import MockCustomSearch, MockHackerOne  # noqa: E402
+from scopeminer import H1ScopeMiner, read_scope_file, write_scope_file  # noqa: E402
+
+QUERY = "inurl:/content/dam"
+
+
+def write_config(home: Path, cse_endpoint: str, args: argparse.Namespace) -> None:
+    config_dir = home / ".config/scope-dorker"
+    config_dir.mkdir(parents=True, exist_ok=True)
+    config = {
+        "apis": {
+            "h1": {"api-key": "bench", "username": "bench"},
+            "google": {
+                "api-key": "bench",
+                "cse-id": "bench",
+                "endpoint": cse_endpoint,
+                "program-result-limit": args.result_limit,
+                "search-limit": 10_000_000,
+                # Keep the client-side rate limiter out of the way of the mock's latency
+                "requests-per-minute": 600_000,
+                "max-requests-per-minute": 600_000,
+            },
+        }
+    }
+    (config_dir / "config.json").write_text(json.dumps(config), encoding="utf-8")
+
+
+def bench_platform(program_count: int, args: argparse.Namespace) -> dict:
+    mock_options = {"latency": args.latency, "throttle_rate": args.throttle_rate, "retry_after": args.retry_after}
+    with tempfile.TemporaryDirectory() as home, \
+            MockHackerOne(program_count, args.assets, **mock_options) as h1, \
+            MockCustomSearch(args.results, **mock_options) as cse:
+        os.environ["HOME"] = home
+        write_config(Path(home), cse.endpoint, args)
+        config = Config()
+        metrics = MetricsRegistry()
+
+        miner = H1ScopeMiner(max_workers=args.workers, metrics=metrics, api_url=h1.api_url)
+        started = time.perf_counter()
+        scopes = list(miner.iter_all_scopes("YmVuY2g6YmVuY2g=", include_oos=True))
+        mining_seconds = time.perf_counter() - started
+
+        dorker = GoogleDorker(config, max_workers=args.workers, metrics=metrics)
+        started = time.perf_counter()
+        results = list(dorker.iter_dorks(QUERY, scopes))
+        dorking_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        dork_count = sum(len(ScopeQueryFactory.create_scope_querys(QUERY, scope)) for scope in scopes)
+        factory_seconds = time.perf_counter() - started
+
+        scope_path = Path(home) / "scopes.jsonl"
+        started = time.perf_counter()
+        write_scope_file(scope_path, scopes)
+        reread = sum(1 for _ in read_scope_file(scope_path))
+        serialise_seconds = time.perf_counter() - started
+        assert reread == len(scopes)
+
+    links = sum(len(result.get_links()) for result in results)
+    cse_requests = metrics.get_counter("cse_requests_total")
+    return {
+        "programs": program_count,
+        "mine_s": mining_seconds,
+        "programs_per_s": program_count / mining_seconds,
+        "h1_requests": h1.requests,
+        "dork_s": dorking_seconds,
+        "dorks": dork_count,
+        "cse_requests": cse_requests,
+        "throttled": cse.throttled + h1.throttled,
+        "links": links,
+        "links_per_s": links / dorking_seconds,
+        "requests_per_link": cse_requests / max(links, 1),
+        "factory_ms": factory_seconds * 1000,
+        "scope_io_ms": serialise_seconds * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--programs", type=int, nargs="+", default=[10, 100, 1000, 10_000])
+    parser.add_argument("--assets", type=int, default=5, help="Assets per program")
+    parser.add_argument("--latency", type=float, default=0.01, help="Seconds added to every mock response")
+    parser.add_argument("--throttle-rate", type=float, default=0.002, help="Share of requests answered with 429")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with each 429")
+    parser.add_argument("--results", type=int, default=30, help="Results the mock CSE returns per dork")
+    parser.add_argument("--result-limit", type=int, default=20, help="program-result-limit")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--json", action="store_true", help="Print one JSON object per platform size")
+    args = parser.parse_args()
+
+    columns = [
+        ("programs", 9, "d"), ("mine_s", 8, ".2f"), ("programs_per_s", 15, ".0f"), ("dork_s", 8, ".2f"),
+        ("cse_requests", 13, ".0f"), ("throttled", 10, "d"), ("links", 8, "d"), ("links_per_s", 12, ".0f"),
+        ("requests_per_link", 18, ".3f"), ("factory_ms", 11, ".1f"), ("scope_io_ms", 12, ".1f"),
+    ]
+    if not args.json:
+        print(" ".join(f"{name:>{width}}" for name, width, _ in columns))
+    for program_count in args.programs:
+        row = bench_platform(program_count, args)
+        if args.json:
+            print(json.dumps(row))
+        else:
+            print(" ".join(f"{row[name]:>{width}{spec}}" for name, width, spec in columns), flush=True)
+
+
+if __name__ == "__main__":
+    main()
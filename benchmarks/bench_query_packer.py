@@ -0,0 +1,91 @@
+"""
+Micro-benchmark for ScopeQueryFactory packing on large synthetic scopes.
+
+Compares the previous quadratic packer (rebuilding the dork for every
+tentative asset) with the incremental greedy packer and the bin packer,
+reporting time and number of dorks produced.
+
+Usage: python benchmarks/bench_query_packer.py [--assets 10000 50000] [--repeat 3]
+"""
+import argparse
+import random
+import string
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from dorking.scope_query_factory import ScopeQueryFactory  # noqa: E402
+from scopeminer import ProgramScope  # noqa: E402
+
+QUERY = "inurl:/content/dam"
+
+
+def legacy_group_assets(assets: list[str], query: str) -> list[list[str]]:
+    """The packer before incremental length tracking, kept as a baseline."""
+    groups: list[list[str]] = []
+    current_group: list[str] = []
+    for asset in assets:
+        tentative_group = current_group + [asset]
+        tentative_dork = ScopeQueryFactory._build_dork(tentative_group, query)
+        if (
+            len(tentative_dork) > ScopeQueryFactory.MAX_QUERY_LENGTH or
+            len(tentative_group) > ScopeQueryFactory.MAX_SITE_OPERATORS
+        ):
+            if current_group:
+                groups.append(current_group)
+            current_group = [asset]
+        else:
+            current_group = tentative_group
+    if current_group:
+        groups.append(current_group)
+    return groups
+
+
+def synthetic_scope(asset_count: int, seed: int = 1337) -> ProgramScope:
+    """Hosts of mixed depth and length, with a share of wildcards, like real programs."""
+    rng = random.Random(seed)
+    assets = set()
+    while len(assets) < asset_count:
+        labels = [
+            "".join(rng.choices(string.ascii_lowercase + string.digits, k=rng.randint(2, 40)))
+            for _ in range(rng.randint(1, 4))
+        ]
+        host = ".".join(labels + [rng.choice(["com", "net", "io", "co.uk"])])
+        assets.add(f".{host}" if rng.random() < 0.2 else host)
+    return ProgramScope(platform="Synthetic", name=f"synthetic-{asset_count}", url_assets=assets)
+
+
+def time_call(func, repeat: int) -> tuple[float, object]:
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--assets", type=int, nargs="+", default=[10_000, 50_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'assets':>8} {'packer':<10} {'seconds':>10} {'dorks':>7} {'max len':>8}")
+    for asset_count in args.assets:
+        assets = synthetic_scope(asset_count).get_url_assets()
+        packers = {
+            "legacy": lambda: legacy_group_assets(assets, QUERY),
+            "greedy": lambda: ScopeQueryFactory._group_assets(assets, QUERY),
+            "bin-pack": lambda: ScopeQueryFactory._group_assets(assets, QUERY, bin_pack=True),
+        }
+        for name, packer in packers.items():
+            seconds, groups = time_call(packer, args.repeat)
+            longest = max(len(ScopeQueryFactory._build_dork(group, QUERY)) for group in groups)
+            print(f"{asset_count:>8} {name:<10} {seconds:>10.4f} {len(groups):>7} {longest:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Startup benchmark for scope-dorker.py.
+
+Times fresh interpreter runs of the CLI on code paths that never touch an
+API (--help, a missing query, re-exporting a scope file) and compares them
+with importing every subsystem up front, as the CLI used to. For each case
+it also reports how long imports took and whether ``requests`` was loaded.
+
+Usage: python benchmarks/bench_startup.py [--repeat 20] [--programs 1000]
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+SCRIPT = str(ROOT / "scope-dorker.py")
+EAGER_IMPORTS = (
+    "import config, daemon, dorking, scopeminer; "
+    "config.Config, dorking.GoogleDorker, dorking.ResponseCache, dorking.SeenLinks, "
+    "scopeminer.H1ScopeMiner, scopeminer.BountyTargetsScopeMiner, daemon.DaemonClient, daemon.DorkDaemon"
+)
+IMPORT_RE = re.compile(r"^import time:\s+\d+\s+\|\s+(\d+)\s+\|( *)(\S+)$")
+
+
+def write_fixtures(home: Path, program_count: int) -> Path:
+    config_dir = home / ".config/scope-dorker"
+    config_dir.mkdir(parents=True)
+    config = {"apis": {"h1": {"api-key": "bench", "username": "bench"}, "google": {"api-key": "bench", "cse-id": "bench"}}}
+    (config_dir / "config.json").write_text(json.dumps(config), encoding="utf-8")
+    scopes = home / "scopes.jsonl"
+    with scopes.open("w", encoding="utf-8") as file_handle:
+        for index in range(program_count):
+            scope = {"platform": "HackerOne", "name": f"program-{index}", "url_assets": [f".program-{index}.com"]}
+            file_handle.write(json.dumps(scope) + "\n")
+    return scopes
+
+
+def run(argv: list[str], env: dict[str, str]) -> float:
+    started = time.perf_counter()
+    subprocess.run(argv, env=env, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - started
+
+
+def import_profile(argv: list[str], env: dict[str, str]) -> tuple[float, bool]:
+    """Total import time of top-level modules in seconds, and whether ``requests`` was imported."""
+    result = subprocess.run(
+        [argv[0], "-X", "importtime", *argv[1:]],
+        env=env,
+        cwd=ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        encoding="utf-8",
+    )
+    total_us = 0
+    loaded_requests = False
+    for line in result.stderr.splitlines():
+        match = IMPORT_RE.match(line)
+        if match is None:
+            continue
+        cumulative, indent, module = match.groups()
+        # Only top-level imports; their cumulative time includes everything below them
+        if len(indent) == 1:
+            total_us += int(cumulative)
+        loaded_requests = loaded_requests or module == "requests"
+    return total_us / 1_000_000, loaded_requests
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per case; the median is reported")
+    parser.add_argument("--programs", type=int, default=1000, help="Programs in the scope file used by the export case")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as home:
+        scopes = write_fixtures(Path(home), args.programs)
+        env = {**os.environ, "HOME": home}
+        python = sys.executable
+        cases = [
+            ("interpreter only", [python, "-c", "pass"]),
+            ("--help", [python, SCRIPT, "--help"]),
+            ("missing query", [python, SCRIPT, "-is", str(scopes)]),
+            ("scope export", [python, SCRIPT, "-is", str(scopes), "-os", str(Path(home) / "out.jsonl")]),
+            ("all subsystems", [python, "-c", EAGER_IMPORTS]),
+        ]
+
+        print(f"{'case':<18} {'median_ms':>10} {'min_ms':>8} {'imports_ms':>11} {'requests':>9}")
+        for name, argv in cases:
+            # Warm the OS file cache and the bytecode of the modules involved
+            run(argv, env)
+            timings = [run(argv, env) for _ in range(args.repeat)]
+            import_seconds, loaded_requests = import_profile(argv, env)
+            print(
+                f"{name:<18} {statistics.median(timings) * 1000:>10.1f} {min(timings) * 1000:>8.1f} "
+                f"{import_seconds * 1000:>11.1f} {'yes' if loaded_requests else 'no':>9}",
+                flush=True,
+            )
+
+
+if __name__ == "__main__":
+    main()
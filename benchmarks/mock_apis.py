@@ -0,0 +1,181 @@
+"""
+Local stand-ins for the HackerOne and Custom Search APIs, used by the benchmarks.
+
+Both servers run in a background thread on 127.0.0.1 and emulate just enough
+of the real APIs for H1ScopeMiner and GoogleDorker: HackerOne's paginated
+``programs`` and ``structured_scopes`` endpoints and the Custom Search JSON
+API. Latency, the share of requests answered with 429 and the number of
+results per dork are configurable.
+"""
+from __future__ import annotations
+
+import json
+import random
+import re
+import time
+from abc import ABC, abstractmethod
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from urllib.parse import parse_qs, urlsplit
+
+PAGE_SIZE = 100
+SITE_RE = re.compile(r"site:(\S+?)(?:\)| |$)")
+
+
+class MockApiServer(ABC):
+    """Threaded HTTP server with simulated latency and throttling; subclasses answer the requests."""
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        throttle_rate: float = 0.0,
+        retry_after: int = 1,
+        seed: int = 1337,
+    ) -> None:
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.requests = 0
+        self.throttled = 0
+        self._random = random.Random(seed)
+        self._lock = Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out in separate writes; don't let Nagle hold the body back
+            disable_nagle_algorithm = True
+
+            def do_GET(self) -> None:
+                server._handle(self)
+
+            def log_message(self, format: str, *args: object) -> None:
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> MockApiServer:
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def _handle(self, handler: BaseHTTPRequestHandler) -> None:
+        with self._lock:
+            self.requests += 1
+            throttle = self._random.random() < self.throttle_rate
+            if throttle:
+                self.throttled += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        if throttle:
+            status, body = 429, {"error": {"code": 429, "message": "Rate limit exceeded"}}
+            # urllib3 only accepts whole seconds
+            headers = {"Retry-After": str(self.retry_after)}
+        else:
+            url = urlsplit(handler.path)
+            status, body = self.respond(url.path, parse_qs(url.query))
+            headers = {}
+
+        payload = json.dumps(body).encode("utf-8")
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(payload)))
+        for name, value in headers.items():
+            handler.send_header(name, value)
+        handler.end_headers()
+        handler.wfile.write(payload)
+
+    @abstractmethod
+    def respond(self, path: str, params: dict[str, list[str]]) -> tuple[int, dict]:
+        """Return the status and JSON body for a GET of ``path`` with query ``params``."""
+
+
+class MockHackerOne(MockApiServer):
+    """``/v1/hackers/programs`` and ``/v1/hackers/programs/<handle>/structured_scopes``."""
+
+    def __init__(self, program_count: int, assets_per_program: int = 5, **kwargs: object) -> None:
+        super().__init__(**kwargs)
+        self.program_count = program_count
+        self.assets_per_program = assets_per_program
+
+    @property
+    def api_url(self) -> str:
+        return f"{self.base_url}/v1"
+
+    def respond(self, path: str, params: dict[str, list[str]]) -> tuple[int, dict]:
+        page = int(params.get("page[number]", ["1"])[0])
+        match = re.fullmatch(r"/v1/hackers/programs/([^/]+)/structured_scopes", path)
+        if match:
+            handle = match.group(1)
+            assets = [
+                {
+                    "attributes": {
+                        "asset_type": "URL",
+                        "asset_identifier": f"*.{handle}.com" if index == 0 else f"app{index}.{handle}.com",
+                        "eligible_for_bounty": index % 2 == 0,
+                        "updated_at": "2024-01-01T00:00:00.000Z",
+                    }
+                }
+                for index in range(self.assets_per_program)
+            ]
+            return 200, self._page(assets, page, path)
+        if path == "/v1/hackers/programs":
+            programs = [
+                {"attributes": {"handle": f"program-{index}", "submission_state": "open", "offers_bounties": True}}
+                for index in range(self.program_count)
+            ]
+            return 200, self._page(programs, page, path)
+        return 404, {"errors": [{"title": "Not found"}]}
+
+    def _page(self, items: list[dict], page: int, path: str) -> dict:
+        data = items[(page - 1) * PAGE_SIZE:page * PAGE_SIZE]
+        links = {}
+        if page * PAGE_SIZE < len(items):
+            links["next"] = f"{self.base_url}{path}?page%5Bnumber%5D={page + 1}&page%5Bsize%5D={PAGE_SIZE}"
+        return {"data": data, "links": links}
+
+
+class MockCustomSearch(MockApiServer):
+    """``/customsearch/v1``, returning ``results_per_dork`` links spread over a dork's site: operators."""
+
+    def __init__(self, results_per_dork: int = 30, **kwargs: object) -> None:
+        super().__init__(**kwargs)
+        self.results_per_dork = results_per_dork
+
+    @property
+    def endpoint(self) -> str:
+        return f"{self.base_url}/customsearch/v1"
+
+    def respond(self, path: str, params: dict[str, list[str]]) -> tuple[int, dict]:
+        if path != "/customsearch/v1":
+            return 404, {"error": {"code": 404, "message": "Not found"}}
+        query = params.get("q", [""])[0]
+        start = int(params.get("start", ["1"])[0])
+        num = int(params.get("num", ["10"])[0])
+        sites = SITE_RE.findall(query) or ["example.com"]
+
+        end = min(start + num, self.results_per_dork + 1)
+        items = []
+        for rank in range(start, end):
+            site = sites[rank % len(sites)]
+            host = f"www{site}" if site.startswith(".") else site
+            items.append({"link": f"https://{host}/result/{rank}"})
+        body: dict = {
+            "items": items,
+            "queries": {},
+            "searchInformation": {"totalResults": str(self.results_per_dork)},
+        }
+        if end <= self.results_per_dork:
+            body["queries"]["nextPage"] = [{"startIndex": end}]
+        return 200, body
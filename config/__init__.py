@@ -1,4 +1,39 @@
-from .config import Config
-from .factory import ConfigFactory
+from __future__ import annotations
 
-__all__ = ["Config", "ConfigFactory"]
\ No newline at end of file
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .config import Config
+    from .factory import ConfigFactory
+    from .quota_ledger import QuotaLedger
+
+# Quota ledger counter shared by all API keys; defined here so callers don't
+# have to import the ledger (and sqlite3) to name it
+SEARCHES = "searches"
+
+# Public name -> defining submodule, imported on first use
+_EXPORTS = {
+    "Config": ".config",
+    "ConfigFactory": ".factory",
+    "QuotaLedger": ".quota_ledger",
+}
+
+__all__ = [
+    "Config",
+    "ConfigFactory",
+    "QuotaLedger",
+    "SEARCHES",
+]
+
+
+def __getattr__(name: str) -> object:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *_EXPORTS})
@@ -1,29 +1,36 @@
+from __future__ import annotations
+
 import json
-import datetime
 from pathlib import Path
-from typing import Any
+from threading import Lock
+from typing import TYPE_CHECKING, Any
+
+from . import SEARCHES
 
-DATE_FORMAT = "%Y%m%d"
+if TYPE_CHECKING:
+    from .quota_ledger import QuotaLedger
 
 DEFAULT_CONFIG: dict[str, Any] = {
     "apis": {
         "h1": {
             "api-key": "<insert-your-h1-api-key>",
             "username": "<insert-your-h1-username>",
+            "max-workers": 8,
+            "cache-max-age-hours": 24,
         },
         "google": {
             "api-key": "<insert-your-google-api-key>",
             "cse-id": "<insert-your-google-cse-id>",
             "program-result-limit": 20,
             "search-limit": 1000,
+            "max-workers": 4,
+            "requests-per-minute": 100,
+            "cache-ttl-hours": 24,
+            "cache-max-entries": 10000,
         },
     }
 }
 
-DEFAULT_SEARCH_COUNT: dict[str, int] = {
-    datetime.datetime.now().strftime(DATE_FORMAT): 0
-}
-
 class Config:
     """Configuration loader for scope-dorker."""
 
@@ -31,6 +38,7 @@ class Config:
         user_home = Path.home()
         config_dir = user_home / ".config/scope-dorker"
         config_dir.mkdir(parents=True, exist_ok=True)
+        self._config_dir = config_dir
         config_path = config_dir / "config.json"
 
         if not config_path.exists():
@@ -38,27 +46,27 @@ class Config:
             # Exit the program with a message to the user
             raise SystemExit(f"Config file created at {config_path}. Please update it with your API keys.")
 
-        self._search_count = self._read_search_count()
         with config_path.open("r", encoding="utf-8") as f:
             self._config_data = json.load(f)
-
-    def _read_search_count(self) -> int:
-        user_home = Path.home()
-        config_dir = user_home / ".config/scope-dorker"
-        search_count_path = config_dir / "search-count.json"
-
-        if not search_count_path.exists():
-            search_count_path.write_text(json.dumps(DEFAULT_SEARCH_COUNT, indent=4), encoding="utf-8")
-
-        with search_count_path.open("r", encoding="utf-8") as f:
-            try:
-                search_count_data = json.load(f)
-            except json.JSONDecodeError:
-                search_count_path.write_text(json.dumps(DEFAULT_SEARCH_COUNT, indent=4), encoding="utf-8")
-                search_count_data = dict(DEFAULT_SEARCH_COUNT)
-
-        today_str = datetime.datetime.now().strftime(DATE_FORMAT)
-        return search_count_data.get(today_str, 0)
+        self._quota_ledger = None
+        self._quota_ledger_lock = Lock()
+
+    def _get_quota_ledger(self) -> QuotaLedger:
+        # Opened on first use, so runs that never search don't touch the ledger
+        if self._quota_ledger is None:
+            with self._quota_ledger_lock:
+                if self._quota_ledger is None:
+                    # Imported here so that runs which never search don't load sqlite3
+                    from .quota_ledger import QuotaLedger
+
+                    self._quota_ledger = QuotaLedger(
+                        self._config_dir / "search-count.db",
+                        legacy_path=self._config_dir / "search-count.json",
+                    )
+        return self._quota_ledger
+
+    def get_config_dir(self) -> Path:
+        return self._config_dir
 
     def get_hackerone_config(self) -> dict[str, Any]:
         return self._config_data.get("apis", {}).get("h1", {})
@@ -70,24 +78,12 @@ class Config:
         h1 = self.get_hackerone_config()
         return h1.get("username", ""), h1.get("api-key", "")
     
-    def write_search_count(self) -> None:
-        user_home = Path.home()
-        config_dir = user_home / ".config/scope-dorker"
-        search_count_path = config_dir / "search-count.json"
-
-        with search_count_path.open("r", encoding="utf-8") as f:
-            search_count_data = json.load(f)
-
-        today_str = datetime.datetime.now().strftime(DATE_FORMAT)
-        search_count_data[today_str] = self._search_count
-
-        with search_count_path.open("w", encoding="utf-8") as f:
-            json.dump(search_count_data, f, indent=4)
+    def increment_search_count(self, increment: int = 1, counter: str = SEARCHES) -> None:
+        self._get_quota_ledger().increment(increment, counter)
     
-    def increment_search_count(self, increment: int = 1) -> None:
-        self._search_count += increment
+    def try_reserve_search(self, limit: int, counter: str = SEARCHES) -> bool:
+        """Count one search towards today's ``counter`` unless ``limit`` has been reached."""
+        return self._get_quota_ledger().try_reserve(limit, counter=counter)
     
-    def get_search_count(self) -> int:
-        return self._search_count
-
-    
\ No newline at end of file
+    def get_search_count(self, counter: str = SEARCHES) -> int:
+        return self._get_quota_ledger().get(counter)
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import datetime
+import json
+import sqlite3
+from pathlib import Path
+from threading import Lock
+
+from . import SEARCHES
+
+DATE_FORMAT = "%Y%m%d"
+
+
+class QuotaLedger:
+    """
+    Daily usage counters shared by every scope-dorker process.
+
+    Counters live in a SQLite database in WAL mode. Each update is a single
+    atomic transaction committed immediately, so concurrent processes never
+    overwrite each other's counts and a hard kill loses nothing. Days older
+    than ``retention_days`` are pruned.
+    """
+
+    def __init__(self, path: Path, retention_days: int = 30, legacy_path: Path | None = None) -> None:
+        self._lock = Lock()
+        self._retention_days = retention_days
+        path.parent.mkdir(parents=True, exist_ok=True)
+        is_new = not path.exists()
+
+        # Autocommit mode; transactions are opened explicitly where needed
+        self._conn = sqlite3.connect(str(path), timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS usage (
+                day TEXT NOT NULL,
+                counter TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (day, counter)
+            )
+            """
+        )
+        if is_new and legacy_path is not None:
+            self._import_legacy(legacy_path)
+        self.prune()
+
+    @staticmethod
+    def _today() -> str:
+        return datetime.datetime.now().strftime(DATE_FORMAT)
+
+    def _import_legacy(self, legacy_path: Path) -> None:
+        """Carry over the per-day counts of the old ``search-count.json`` file."""
+        try:
+            with legacy_path.open("r", encoding="utf-8") as f:
+                legacy_counts = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO usage (day, counter, count) VALUES (?, ?, ?)",
+                [(day, SEARCHES, int(count)) for day, count in legacy_counts.items()],
+            )
+
+    def prune(self) -> None:
+        cutoff = (datetime.datetime.now() - datetime.timedelta(days=self._retention_days)).strftime(DATE_FORMAT)
+        with self._lock:
+            self._conn.execute("DELETE FROM usage WHERE day < ?", (cutoff,))
+
+    def get(self, counter: str = SEARCHES) -> int:
+        """Return today's count for ``counter`` across all processes."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT count FROM usage WHERE day = ? AND counter = ?",
+                (self._today(), counter),
+            ).fetchone()
+        return row[0] if row else 0
+
+    def increment(self, amount: int = 1, counter: str = SEARCHES) -> None:
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO usage (day, counter, count) VALUES (?, ?, ?)
+                ON CONFLICT (day, counter) DO UPDATE SET count = count + excluded.count
+                """,
+                (self._today(), counter, amount),
+            )
+
+    def try_reserve(self, limit: int, amount: int = 1, counter: str = SEARCHES) -> bool:
+        """
+        Atomically add ``amount`` to today's count unless that would exceed ``limit``.
+
+        The check and the update happen in one write transaction, so processes
+        sharing the ledger can never jointly overshoot the limit.
+        """
+        today = self._today()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT count FROM usage WHERE day = ? AND counter = ?",
+                    (today, counter),
+                ).fetchone()
+                current = row[0] if row else 0
+                if current + amount > limit:
+                    self._conn.execute("ROLLBACK")
+                    return False
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO usage (day, counter, count) VALUES (?, ?, ?)",
+                    (today, counter, current + amount),
+                )
+                self._conn.execute("COMMIT")
+                return True
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
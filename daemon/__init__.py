@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .auth import load_token
+    from .client import DaemonClient
+    from .jobs import DorkJob, JobQueue
+    from .server import DorkDaemon
+
+# Where the daemon listens, and where clients look for it by default
+DEFAULT_DAEMON_PORT = 8765
+DEFAULT_DAEMON_URL = f"http://127.0.0.1:{DEFAULT_DAEMON_PORT}"
+# API token shared by the daemon and its clients, in the config directory
+DAEMON_TOKEN_FILE = "daemon-token"
+
+# Public name -> defining submodule, imported on first use so the CLI can
+# read the defaults above without loading the HTTP server or client
+_EXPORTS = {
+    "DaemonClient": ".client",
+    "DorkDaemon": ".server",
+    "DorkJob": ".jobs",
+    "JobQueue": ".jobs",
+    "load_token": ".auth",
+}
+
+__all__ = [
+    "DEFAULT_DAEMON_PORT",
+    "DAEMON_TOKEN_FILE",
+    "DEFAULT_DAEMON_URL",
+    "DaemonClient",
+    "DorkDaemon",
+    "DorkJob",
+    "JobQueue",
+    "load_token",
+]
+
+
+def __getattr__(name: str) -> object:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *_EXPORTS})
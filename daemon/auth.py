@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import os
+import secrets
+from pathlib import Path
+
+
+def load_token(path: Path, create: bool = False) -> str | None:
+    """
+    Read the daemon's API token from ``path``.
+
+    With ``create=True`` a random token is generated first if there is none,
+    in a file only the current user can read, so every local process of that
+    user can talk to the daemon and nothing else can.
+    """
+    if create and not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            # Another process created it first
+            pass
+        else:
+            with os.fdopen(fd, "w", encoding="utf-8") as file_handle:
+                file_handle.write(secrets.token_urlsafe(32))
+    try:
+        token = path.read_text(encoding="utf-8").strip()
+    except FileNotFoundError:
+        return None
+    except OSError as exc:
+        raise SystemExit(f"Error reading the daemon token from {path}: {exc}")
+    return token or None
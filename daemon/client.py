@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import json
+from typing import Iterator
+
+import requests
+
+from . import DEFAULT_DAEMON_URL
+
+
+class DaemonClient:
+    """Submit dork jobs to a running daemon and read their results back."""
+
+    def __init__(self, url: str = DEFAULT_DAEMON_URL, timeout: float = 30, token: str | None = None) -> None:
+        self._url = url.rstrip("/")
+        self._timeout = timeout
+        self._session = requests.Session()
+        if token:
+            self._session.headers["Authorization"] = f"Bearer {token}"
+
+    def __request(self, method: str, path: str, **kwargs: object) -> requests.Response:
+        kwargs.setdefault("timeout", self._timeout)
+        try:
+            response = self._session.request(method, f"{self._url}{path}", **kwargs)
+        except requests.ConnectionError as exc:
+            raise SystemExit(f"Could not reach the scope-dorker daemon at {self._url}: {exc}")
+        if not response.ok and not kwargs.get("stream"):
+            try:
+                message = response.json().get("error", response.text)
+            except ValueError:
+                message = response.text
+            raise SystemExit(f"Daemon request {method} {path} failed ({response.status_code}): {message}")
+        return response
+
+    def submit(
+        self,
+        queries: list[str],
+        programs: list[str] | None = None,
+        priority: int = 0,
+        new_only: bool = False,
+        pack: bool = False,
+    ) -> dict:
+        """Queue a job and return its description, including ``id``."""
+        body = {
+            "queries": queries,
+            "programs": programs,
+            "priority": priority,
+            "new_only": new_only,
+            "pack": pack,
+        }
+        return self.__request("POST", "/jobs", json=body).json()
+
+    def get_job(self, job_id: str) -> dict:
+        return self.__request("GET", f"/jobs/{job_id}").json()
+
+    def iter_results(self, job_id: str) -> Iterator[dict]:
+        """Yield the job's results as they complete, returning once the job has finished."""
+        # Jobs may run for a long time between results, so only time out connecting
+        response = self.__request("GET", f"/jobs/{job_id}/results", stream=True, timeout=(self._timeout, None))
+        with response:
+            if not response.ok:
+                raise SystemExit(f"Daemon request for job {job_id} failed ({response.status_code})")
+            for line in response.iter_lines():
+                if line:
+                    yield json.loads(line)
+
+    def cancel(self, job_id: str) -> dict:
+        return self.__request("DELETE", f"/jobs/{job_id}").json()
@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+import time
+import uuid
+from threading import Condition, Lock
+from typing import Iterator
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = {DONE, FAILED, CANCELLED}
+
+
+class DorkJob:
+    """
+    One dork request submitted to the daemon and the results collected for it so far.
+
+    Results are appended as each program completes, so clients can stream
+    them while the job is still running or fetch them all once it finished.
+    """
+
+    def __init__(
+        self,
+        queries: list[str],
+        programs: list[str] | None = None,
+        priority: int = 0,
+        new_only: bool = False,
+        pack: bool = False,
+    ) -> None:
+        self.id = uuid.uuid4().hex[:12]
+        self.queries = queries
+        self.programs = programs
+        self.priority = priority
+        self.new_only = new_only
+        self.pack = pack
+        self.status = QUEUED
+        self.error: str | None = None
+        self.submitted_at = time.time()
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+        self._results: list[dict] = []
+        self._changed = Condition(Lock())
+
+    @classmethod
+    def from_json_data(cls, json_data: dict) -> DorkJob:
+        """Build a job from a submitted request body; raises ``ValueError`` when it is malformed."""
+        if not isinstance(json_data, dict):
+            raise ValueError("Expected a JSON object")
+        queries = json_data.get("queries")
+        if queries is None:
+            queries = [json_data["query"]] if json_data.get("query") else []
+        if not isinstance(queries, list) or not all(isinstance(query, str) for query in queries):
+            raise ValueError("'queries' must be a list of strings")
+        # Same normalisation as --query-file
+        queries = list(dict.fromkeys(" ".join(query.split()) for query in queries if query.strip()))
+        if not queries:
+            raise ValueError("A query must be provided")
+
+        programs = json_data.get("programs")
+        if programs is not None and (
+            not isinstance(programs, list) or not all(isinstance(name, str) for name in programs)
+        ):
+            raise ValueError("'programs' must be a list of program handles")
+        priority = json_data.get("priority", 0)
+        if not isinstance(priority, int) or isinstance(priority, bool):
+            raise ValueError("'priority' must be an integer")
+        return cls(
+            queries,
+            programs=programs or None,
+            priority=priority,
+            new_only=bool(json_data.get("new_only", False)),
+            pack=bool(json_data.get("pack", False)),
+        )
+
+    def is_finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    def start(self) -> None:
+        with self._changed:
+            self.status = RUNNING
+            self.started_at = time.time()
+            self._changed.notify_all()
+
+    def add_result(self, result: dict) -> None:
+        with self._changed:
+            self._results.append(result)
+            self._changed.notify_all()
+
+    def finish(self, status: str = DONE, error: str | None = None) -> None:
+        with self._changed:
+            self.status = status
+            self.error = error
+            self.finished_at = time.time()
+            self._changed.notify_all()
+
+    def get_results(self) -> list[dict]:
+        with self._changed:
+            return list(self._results)
+
+    def iter_results(self) -> Iterator[dict]:
+        """Yield results as they arrive until the job has finished."""
+        sent = 0
+        while True:
+            with self._changed:
+                while sent == len(self._results) and not self.is_finished():
+                    self._changed.wait()
+                pending = self._results[sent:]
+                finished = self.is_finished()
+            yield from pending
+            sent += len(pending)
+            if finished and sent == len(self._results):
+                return
+
+    def to_json_dict(self, include_results: bool = False) -> dict:
+        json_dict = {
+            "id": self.id,
+            "status": self.status,
+            "queries": self.queries,
+            "programs": self.programs,
+            "priority": self.priority,
+            "new_only": self.new_only,
+            "pack": self.pack,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "result_count": len(self._results),
+        }
+        if self.error is not None:
+            json_dict["error"] = self.error
+        if include_results:
+            json_dict["results"] = self.get_results()
+        return json_dict
+
+
+class JobQueue:
+    """
+    Priority queue of dork jobs plus a bounded history of finished ones.
+
+    Higher ``priority`` runs first; jobs of equal priority run in the order
+    they were submitted. Only the ``max_finished`` most recently finished
+    jobs are kept for clients to fetch.
+    """
+
+    def __init__(self, max_finished: int = 500) -> None:
+        self._max_finished = max_finished
+        self._heap: list[tuple[int, int, DorkJob]] = []
+        self._sequence = itertools.count()
+        self._jobs: dict[str, DorkJob] = {}
+        self._finished: list[str] = []
+        self._closed = False
+        self._available = Condition(Lock())
+
+    def put(self, job: DorkJob) -> int:
+        """Queue ``job`` and return how many queued jobs will run before it."""
+        with self._available:
+            heapq.heappush(self._heap, (-job.priority, next(self._sequence), job))
+            self._jobs[job.id] = job
+            self._available.notify()
+            return sum(
+                1
+                for priority, _, queued in self._heap
+                if queued is not job and queued.status == QUEUED and -priority >= job.priority
+            )
+
+    def get(self) -> DorkJob | None:
+        """Block until a job is available and mark it running; ``None`` once the queue is closed."""
+        with self._available:
+            while True:
+                while not self._heap and not self._closed:
+                    self._available.wait()
+                if self._closed:
+                    return None
+                _, _, job = heapq.heappop(self._heap)
+                # Cancelled jobs stay in the heap until they come up
+                if job.status == QUEUED:
+                    job.start()
+                    return job
+
+    def cancel(self, job: DorkJob) -> bool:
+        """Cancel a job that hasn't started yet."""
+        with self._available:
+            if job.status != QUEUED:
+                return False
+            job.finish(CANCELLED)
+            self._record_finished(job)
+            return True
+
+    def task_done(self, job: DorkJob) -> None:
+        with self._available:
+            self._record_finished(job)
+
+    def _record_finished(self, job: DorkJob) -> None:
+        self._finished.append(job.id)
+        while len(self._finished) > self._max_finished:
+            self._jobs.pop(self._finished.pop(0), None)
+
+    def find(self, job_id: str) -> DorkJob | None:
+        with self._available:
+            return self._jobs.get(job_id)
+
+    def list_jobs(self) -> list[DorkJob]:
+        with self._available:
+            return sorted(self._jobs.values(), key=lambda job: job.submitted_at)
+
+    def queued_count(self) -> int:
+        with self._available:
+            return sum(1 for _, _, job in self._heap if job.status == QUEUED)
+
+    def close(self) -> None:
+        """Wake every waiting worker so it can exit."""
+        with self._available:
+            self._closed = True
+            self._available.notify_all()
@@ -0,0 +1,310 @@
+from __future__ import annotations
+
+import hmac
+import json
+import sys
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+from typing import Callable, Iterable, Iterator, Optional
+
+from config import Config
+from dorking import CredentialPool, GoogleDorker, ResponseCache, SeenLinks
+from dorking.google_dorker import REQUEST_WINDOW_SECONDS
+from metrics import MetricsRegistry
+from scopeminer import ProgramScope, ScopeCache, ScopeCompactor
+
+from . import DEFAULT_DAEMON_PORT
+from .jobs import DONE, FAILED, DorkJob, JobQueue
+
+# Called with a job's program handles (None for every program)
+ScopeSource = Callable[[Optional[list[str]]], Iterable[ProgramScope]]
+
+MAX_REQUEST_BYTES = 1024 * 1024
+# Host headers a request to the loopback listener may carry; anything else
+# means a browser was pointed at it through another name (DNS rebinding)
+LOCAL_HOSTS = {"127.0.0.1", "localhost", "[::1]"}
+
+
+class DorkDaemon:
+    """
+    Long-running dork service with a small JSON API on localhost.
+
+    Config, program scopes, the response cache, the seen-links index, HTTP
+    connection pools and every API key's adaptive rate limiter stay warm
+    between jobs, so many small jobs cost no more than one large run and
+    back-to-back jobs can't overshoot the per-minute quota. Jobs are queued
+    by priority and run ``concurrent_jobs`` at a time, each on
+    ``max_workers`` threads sharing the same limiters and daily quota.
+
+    Requests from browsers are refused, and with ``token`` set every endpoint
+    but ``/metrics`` needs it as a bearer token, since jobs spend the keys'
+    quota.
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        scope_source: ScopeSource,
+        response_cache: ResponseCache | None = None,
+        seen_links: SeenLinks | None = None,
+        scope_cache: ScopeCache | None = None,
+        metrics: MetricsRegistry | None = None,
+        bin_pack: bool = False,
+        compact: bool = True,
+        max_workers: int = 4,
+        concurrent_jobs: int = 1,
+        token: str | None = None,
+    ) -> None:
+        self._config = config
+        self._token = token
+        self._scope_source = scope_source
+        self._response_cache = response_cache
+        self._seen_links = seen_links
+        self._scope_cache = scope_cache
+        self._metrics = metrics if metrics is not None else MetricsRegistry()
+        self._bin_pack = bin_pack
+        self._compact = compact
+        self._max_workers = max(1, max_workers)
+        self._concurrent_jobs = max(1, concurrent_jobs)
+        self._credential_pool = CredentialPool(
+            config,
+            REQUEST_WINDOW_SECONDS,
+            pool_size=self._max_workers * self._concurrent_jobs,
+        )
+        self._queue = JobQueue()
+        self._workers = [
+            Thread(target=self._work, name=f"dork-job-{index}", daemon=True)
+            for index in range(self._concurrent_jobs)
+        ]
+
+    def submit(self, job: DorkJob) -> int:
+        """Queue ``job``; returns how many queued jobs are ahead of it."""
+        self._metrics.inc("daemon_jobs_submitted_total")
+        return self._queue.put(job)
+
+    def find(self, job_id: str) -> DorkJob | None:
+        return self._queue.find(job_id)
+
+    def list_jobs(self) -> list[DorkJob]:
+        return self._queue.list_jobs()
+
+    def cancel(self, job: DorkJob) -> bool:
+        cancelled = self._queue.cancel(job)
+        if cancelled:
+            self._metrics.inc("daemon_jobs_total", status=job.status)
+        return cancelled
+
+    def is_authorised(self, authorization: str | None) -> bool:
+        """Whether an ``Authorization`` header carries the daemon's token (always true without one)."""
+        if self._token is None:
+            return True
+        scheme, _, token = (authorization or "").partition(" ")
+        return scheme.lower() == "bearer" and hmac.compare_digest(token.strip(), self._token)
+
+    def render_metrics(self) -> str:
+        self._update_gauges()
+        return self._metrics.to_prometheus()
+
+    def _update_gauges(self) -> None:
+        self._metrics.set("daemon_queue_depth", self._queue.queued_count())
+        self._metrics.set("search_quota_used", self._config.get_search_count())
+        self._metrics.set("search_quota_limit", self._credential_pool.total_limit)
+
+    def serve(self, host: str = "127.0.0.1", port: int = DEFAULT_DAEMON_PORT) -> None:
+        """Run jobs and answer API requests until interrupted."""
+        httpd = ThreadingHTTPServer((host, port), _DaemonRequestHandler)
+        httpd.daemon_threads = True
+        httpd.dork_daemon = self
+        for worker in self._workers:
+            worker.start()
+        print(f"ℹ️ scope-dorker daemon listening on http://{host}:{httpd.server_port}", file=sys.stderr)
+        try:
+            httpd.serve_forever()
+        except KeyboardInterrupt:
+            print("ℹ️ Shutting down", file=sys.stderr)
+        finally:
+            httpd.server_close()
+            self._queue.close()
+            self._update_gauges()
+
+    def _work(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            started = time.monotonic()
+            try:
+                self._run_job(job)
+                job.finish(DONE)
+            # The dorker raises SystemExit on unrecoverable API errors; that must only end the job
+            except (Exception, SystemExit) as exc:
+                # The dorker's SystemExit wraps the API error that caused it
+                error = exc.__cause__ or exc
+                job.finish(FAILED, str(error) or error.__class__.__name__)
+                print(f"❌ Job {job.id} failed: {job.error}", file=sys.stderr)
+            finally:
+                self._queue.task_done(job)
+                self._metrics.inc("daemon_jobs_total", status=job.status)
+                self._metrics.observe("daemon_job_seconds", time.monotonic() - started)
+                if self._scope_cache is not None:
+                    self._scope_cache.save()
+
+    def _run_job(self, job: DorkJob) -> None:
+        # A fresh dorker per job keeps the page memo and seen-links choice job-local,
+        # while the credential pool carries the warm limiters and connections
+        dorker = GoogleDorker(
+            self._config,
+            bin_pack=self._bin_pack,
+            response_cache=self._response_cache,
+            max_workers=self._max_workers,
+            seen_links=self._seen_links if job.new_only else None,
+            metrics=self._metrics,
+            credential_pool=self._credential_pool,
+            compact=self._compact,
+        )
+        program_scopes = self._scope_source(job.programs)
+        if job.pack:
+            program_scopes = list(program_scopes)
+            assets = ScopeCompactor.compact_union(program_scopes)[0] if self._compact else None
+            results = (
+                result
+                for query in job.queries
+                for result in dorker.execute_packed_dorks(query, program_scopes, assets)
+            )
+        else:
+            results = dorker.iter_dork_matrix(job.queries, program_scopes)
+        for result in results:
+            job.add_result(result.to_json_dict())
+
+
+class _DaemonRequestHandler(BaseHTTPRequestHandler):
+    """
+    JSON API of the daemon.
+
+    - ``POST /jobs``: submit ``{"queries": [...], "programs": [...], "priority": 0, "new_only": false, "pack": false}``
+    - ``GET /jobs``: list known jobs
+    - ``GET /jobs/<id>``: a job's status and results so far
+    - ``GET /jobs/<id>/results``: stream results as JSON lines until the job finishes
+    - ``DELETE /jobs/<id>``: cancel a queued job
+    - ``GET /metrics``: daemon metrics in the Prometheus text format
+
+    Requests with an ``Origin`` header or a non-local ``Host`` come from a
+    browser and are refused, so web pages can't drive the API, and job
+    submissions must be ``application/json``, which browsers can't send
+    cross-origin without a preflight.
+    """
+
+    server_version = "scope-dorker"
+
+    @property
+    def dork_daemon(self) -> DorkDaemon:
+        return self.server.dork_daemon
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        parts = self._path_parts()
+        if not self._check_request(public=parts == ["metrics"]):
+            return
+        if parts == ["metrics"]:
+            self._send_text(HTTPStatus.OK, self.dork_daemon.render_metrics(), "text/plain; version=0.0.4")
+        elif parts == ["jobs"]:
+            self._send_json(HTTPStatus.OK, [job.to_json_dict() for job in self.dork_daemon.list_jobs()])
+        elif len(parts) == 2 and parts[0] == "jobs":
+            job = self._find_job(parts[1])
+            if job is not None:
+                self._send_json(HTTPStatus.OK, job.to_json_dict(include_results=True))
+        elif len(parts) == 3 and parts[0] == "jobs" and parts[2] == "results":
+            job = self._find_job(parts[1])
+            if job is not None:
+                self._stream_results(job.iter_results())
+        else:
+            self._send_error(HTTPStatus.NOT_FOUND, "Not found")
+
+    def do_POST(self) -> None:
+        if not self._check_request():
+            return
+        if self._path_parts() != ["jobs"]:
+            self._send_error(HTTPStatus.NOT_FOUND, "Not found")
+            return
+        content_type = (self.headers.get("Content-Type") or "").split(";", 1)[0].strip().lower()
+        if content_type != "application/json":
+            self._send_error(HTTPStatus.UNSUPPORTED_MEDIA_TYPE, "Jobs must be submitted as application/json")
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_REQUEST_BYTES:
+            self._send_error(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body too large")
+            return
+        try:
+            job = DorkJob.from_json_data(json.loads(self.rfile.read(length) or b"{}"))
+        except (ValueError, KeyError) as exc:
+            self._send_error(HTTPStatus.BAD_REQUEST, str(exc))
+            return
+        ahead = self.dork_daemon.submit(job)
+        self._send_json(HTTPStatus.ACCEPTED, {**job.to_json_dict(), "queued_ahead": ahead})
+
+    def do_DELETE(self) -> None:
+        if not self._check_request():
+            return
+        parts = self._path_parts()
+        if len(parts) != 2 or parts[0] != "jobs":
+            self._send_error(HTTPStatus.NOT_FOUND, "Not found")
+            return
+        job = self._find_job(parts[1])
+        if job is None:
+            return
+        if not self.dork_daemon.cancel(job):
+            self._send_error(HTTPStatus.CONFLICT, f"Job {job.id} is already {job.status}")
+            return
+        self._send_json(HTTPStatus.OK, job.to_json_dict())
+
+    def _check_request(self, public: bool = False) -> bool:
+        """Refuse browser requests and, unless ``public``, requests without the token; sends the error itself."""
+        host = (self.headers.get("Host") or "").lower()
+        hostname = host.rsplit(":", 1)[0] if not host.endswith("]") else host
+        if self.headers.get("Origin") is not None or hostname not in LOCAL_HOSTS:
+            self._send_error(HTTPStatus.FORBIDDEN, "Requests from browsers are not accepted")
+            return False
+        if not public and not self.dork_daemon.is_authorised(self.headers.get("Authorization")):
+            self._send_error(HTTPStatus.UNAUTHORIZED, "Missing or wrong daemon token")
+            return False
+        return True
+
+    def _path_parts(self) -> list[str]:
+        return [part for part in self.path.split("?", 1)[0].split("/") if part]
+
+    def _find_job(self, job_id: str) -> DorkJob | None:
+        job = self.dork_daemon.find(job_id)
+        if job is None:
+            self._send_error(HTTPStatus.NOT_FOUND, f"Unknown job {job_id}")
+        return job
+
+    def _stream_results(self, results: Iterator[dict]) -> None:
+        # No Content-Length: the response ends when the connection closes
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        try:
+            for result in results:
+                self.wfile.write(json.dumps(result).encode("utf-8") + b"\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # The client went away; the job carries on
+            pass
+
+    def _send_json(self, status: HTTPStatus, body: object) -> None:
+        self._send_text(status, json.dumps(body), "application/json")
+
+    def _send_error(self, status: HTTPStatus, message: str) -> None:
+        self._send_json(status, {"error": message})
+
+    def _send_text(self, status: HTTPStatus, body: str, content_type: str) -> None:
+        payload = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
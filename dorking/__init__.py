@@ -1,3 +1,52 @@
-from .google_dorker import GoogleDorker
+from __future__ import annotations
 
-__all__ = ["GoogleDorker"]
\ No newline at end of file
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .budget_scheduler import BudgetScheduler
+    from .credential_pool import CredentialPool
+    from .custom_search_client import CustomSearchClient, CustomSearchError
+    from .dork_result import DorkResults
+    from .google_dorker import GoogleDorker
+    from .progress_journal import ProgressJournal
+    from .response_cache import ResponseCache
+    from .seen_links import SeenLinks
+
+# Public name -> defining submodule. Submodules are imported on first use, so
+# e.g. reading a scope file never pays for importing the HTTP stack
+_EXPORTS = {
+    "BudgetScheduler": ".budget_scheduler",
+    "CredentialPool": ".credential_pool",
+    "CustomSearchClient": ".custom_search_client",
+    "CustomSearchError": ".custom_search_client",
+    "DorkResults": ".dork_result",
+    "GoogleDorker": ".google_dorker",
+    "ProgressJournal": ".progress_journal",
+    "ResponseCache": ".response_cache",
+    "SeenLinks": ".seen_links",
+}
+
+__all__ = [
+    "BudgetScheduler",
+    "CredentialPool",
+    "CustomSearchClient",
+    "CustomSearchError",
+    "DorkResults",
+    "GoogleDorker",
+    "ProgressJournal",
+    "ResponseCache",
+    "SeenLinks",
+]
+
+
+def __getattr__(name: str) -> object:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *_EXPORTS})
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import math
+from threading import Lock
+
+from scopeminer import ProgramScope, ScopeCompactor
+
+from .scope_query_factory import ScopeQueryFactory
+
+RESULTS_PER_PAGE = 10
+
+
+class RequestBudget:
+    """Number of Custom Search requests one program may still send."""
+
+    def __init__(self, scheduler: BudgetScheduler, allowance: int) -> None:
+        self._scheduler = scheduler
+        self.remaining = allowance
+
+    def try_spend(self) -> bool:
+        """Spend one request from this program's allowance, falling back to the shared spare pool."""
+        if self.remaining > 0:
+            self.remaining -= 1
+            return True
+        return self._scheduler._take_spare()
+
+    def release(self) -> None:
+        """Hand the unused allowance back so programs still running can use it."""
+        self._scheduler._add_spare(self.remaining)
+        self.remaining = 0
+
+
+class BudgetScheduler:
+    """
+    Plan how the remaining daily Custom Search budget is spread across programs.
+
+    ``query`` may be a list of queries, in which case every (query, program)
+    pair is planned as a program of its own. Each program's demand is the number of pages its dorks could need
+    (``ceil(program-result-limit / 10)`` per dork). The budget is divided by
+    max-min fair water-filling, weighted by optional per-program ``weights``,
+    so every program gets its first pages before any program gets extra ones.
+    With ``compact`` demands are counted on compacted assets, as the dorker
+    searches them. Allowance a program doesn't use (its results ran out early) goes into a
+    shared spare pool for the others.
+    """
+
+    def __init__(
+        self,
+        query: str | list[str],
+        prog_scopes: list[ProgramScope],
+        budget: int,
+        program_result_limit: int,
+        bin_pack: bool = False,
+        weights: dict[str, float] | None = None,
+        compact: bool = False,
+    ) -> None:
+        pages_per_dork = max(1, math.ceil(program_result_limit / RESULTS_PER_PAGE))
+        self._queries = [query] if isinstance(query, str) else list(query)
+        self._demands = {}
+        for prog_scope in prog_scopes:
+            assets = prog_scope.get_sorted_url_assets()
+            if compact:
+                assets = ScopeCompactor.compact_assets(assets)
+            for q in self._queries:
+                dorks = ScopeQueryFactory.create_scope_querys(q, prog_scope, bin_pack, assets)
+                self._demands[(q, prog_scope.get_name())] = len(dorks) * pages_per_dork
+        self._weights = {key: (weights or {}).get(key[1], 1.0) for key in self._demands}
+        self._allocations = self._water_fill(max(0, budget))
+        self._spare = 0
+        self._lock = Lock()
+
+    def _water_fill(self, budget: int) -> dict[tuple[str, str], int]:
+        keys = list(self._demands)
+        if sum(self._demands.values()) <= budget:
+            return dict(self._demands)
+
+        # Raise a common level until the budget is used up; programs whose demand
+        # is below their share of the level are capped at their demand.
+        by_saturation = sorted(keys, key=lambda key: self._demands[key] / self._weights[key])
+        remaining_budget = float(budget)
+        remaining_weight = sum(self._weights.values())
+        shares: dict[tuple[str, str], float] = {}
+        for key in by_saturation:
+            level = remaining_budget / max(remaining_weight, 1e-9)
+            share = min(self._demands[key], level * self._weights[key])
+            shares[key] = share
+            remaining_budget -= share
+            remaining_weight -= self._weights[key]
+
+        # Round down, then hand out what's left one request at a time in program order
+        allocations = {key: int(shares[key]) for key in keys}
+        leftover = budget - sum(allocations.values())
+        for key in keys:
+            if leftover <= 0:
+                break
+            if allocations[key] < self._demands[key]:
+                allocations[key] += 1
+                leftover -= 1
+        return allocations
+
+    def planned_requests(self) -> int:
+        return sum(self._allocations.values())
+
+    def budget_for(self, prog_scope: ProgramScope, query: str | None = None) -> RequestBudget:
+        query = self._queries[0] if query is None else query
+        return RequestBudget(self, self._allocations.get((query, prog_scope.get_name()), 0))
+
+    def _take_spare(self) -> bool:
+        with self._lock:
+            if self._spare > 0:
+                self._spare -= 1
+                return True
+            return False
+
+    def _add_spare(self, amount: int) -> None:
+        with self._lock:
+            self._spare += amount
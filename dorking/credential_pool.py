@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+from threading import Lock
+from typing import Any
+
+from config import SEARCHES, Config
+
+from .custom_search_client import CUSTOM_SEARCH_ENDPOINT, CustomSearchClient, CustomSearchError
+from .rate_limiter import AdaptiveRateLimiter
+
+# 400/403 reasons meaning the key itself is unusable, rather than the request
+# being malformed or throttled
+INVALID_KEY_REASONS = {"keyInvalid", "keyExpired", "accessNotConfigured", "forbidden"}
+# 403 reasons Google uses for per-minute throttling as well as 429
+RATE_LIMIT_REASONS = {"rateLimitExceeded", "userRateLimitExceeded"}
+# Reasons meaning the key's quota is gone until the daily reset
+DAILY_QUOTA_REASONS = {"dailyLimitExceeded", "quotaExceeded"}
+
+
+def is_daily_quota_exhausted(exc: CustomSearchError) -> bool:
+    """Whether ``exc`` reports the key's daily quota as used up, which retrying can't fix."""
+    return exc.reason in DAILY_QUOTA_REASONS or "PerDay" in exc.quota_limit
+
+
+def is_throttled(exc: CustomSearchError) -> bool:
+    """Whether ``exc`` asks the key to slow down, as opposed to failing the request."""
+    if is_daily_quota_exhausted(exc):
+        return False
+    return exc.status == 429 or (exc.status == 403 and exc.reason in RATE_LIMIT_REASONS)
+
+
+def credential_failure(exc: CustomSearchError) -> str | None:
+    """Return why ``exc`` rules its credential out for the rest of the day, or ``None``."""
+    if exc.status == 401 or (exc.status in (400, 403) and exc.reason in INVALID_KEY_REASONS):
+        return f"rejected ({exc.status} {exc.reason or exc.message})".strip()
+    if is_daily_quota_exhausted(exc):
+        return "daily quota exhausted"
+    return None
+
+
+class Credential:
+    """One Google API key / CSE ID pair with its own rate limiter and daily counter."""
+
+    def __init__(
+        self,
+        name: str,
+        api_key: str,
+        cse_id: str,
+        search_limit: int,
+        rate_limiter: AdaptiveRateLimiter,
+        pool_size: int,
+        counter: str | None = None,
+        endpoint: str = CUSTOM_SEARCH_ENDPOINT,
+    ) -> None:
+        self.name = name
+        self.api_key = api_key
+        self.cse_id = cse_id
+        self.search_limit = search_limit
+        self.rate_limiter = rate_limiter
+        self.counter = counter or f"{SEARCHES}:{name}"
+        self.disabled_reason: str | None = None
+        self.requests = 0
+        self._pool_size = pool_size
+        self._endpoint = endpoint
+        self._client: CustomSearchClient | None = None
+        self._client_lock = Lock()
+
+    def get_client(self) -> CustomSearchClient:
+        """Create this key's Custom Search client on first use and reuse it afterwards."""
+        with self._client_lock:
+            if self._client is None:
+                self._client = CustomSearchClient(self.api_key, endpoint=self._endpoint, pool_size=self._pool_size)
+        return self._client
+
+
+class CredentialPool:
+    """
+    Rotate requests across several Google API key / CSE ID pairs.
+
+    Credentials come from ``apis.google.credentials`` (a list of objects with
+    ``api-key``, ``cse-id`` and optionally ``name``, ``search-limit``,
+    ``requests-per-minute`` and ``max-requests-per-minute``), falling back to
+    the single ``api-key``/``cse-id`` pair. Each request goes to the usable
+    credential whose rate limiter frees up soonest, breaking ties by the
+    lowest share of its daily limit used. Credentials that fail
+    authentication or run out of daily quota are taken out of rotation.
+    """
+
+    def __init__(self, config: Config, request_window_seconds: float, pool_size: int = 10) -> None:
+        self._config = config
+        self._lock = Lock()
+        google_config = config.get_google_config()
+        credential_configs: list[dict[str, Any]] = google_config.get("credentials") or []
+        # A lone top-level key keeps counting against the plain daily counter
+        single_counter = None
+        if not credential_configs:
+            credential_configs = [
+                {"name": "default", "api-key": google_config.get("api-key", ""), "cse-id": google_config.get("cse-id", "")}
+            ]
+            single_counter = SEARCHES
+
+        self._credentials: list[Credential] = []
+        for index, credential_config in enumerate(credential_configs):
+            requests_per_minute = credential_config.get(
+                "requests-per-minute", google_config.get("requests-per-minute", 100)
+            )
+            self._credentials.append(
+                Credential(
+                    name=credential_config.get("name", f"key-{index + 1}"),
+                    api_key=credential_config.get("api-key", ""),
+                    cse_id=credential_config.get("cse-id", ""),
+                    search_limit=credential_config.get("search-limit", google_config.get("search-limit", 10000)),
+                    rate_limiter=AdaptiveRateLimiter(
+                        requests_per_minute,
+                        request_window_seconds,
+                        max_limit=credential_config.get(
+                            "max-requests-per-minute", google_config.get("max-requests-per-minute")
+                        ),
+                    ),
+                    pool_size=pool_size,
+                    counter=single_counter,
+                    endpoint=google_config.get("endpoint", CUSTOM_SEARCH_ENDPOINT),
+                )
+            )
+        self.total_limit = sum(credential.search_limit for credential in self._credentials)
+
+    def get_cse_ids(self) -> list[str]:
+        return list(dict.fromkeys(credential.cse_id for credential in self._credentials))
+
+    def acquire(self) -> Credential | None:
+        """
+        Pick a credential and reserve one search against its daily limit.
+
+        Returns ``None`` when every usable credential has reached its daily
+        limit; raises ``RuntimeError`` when no credential is usable at all.
+        """
+        with self._lock:
+            usable = [credential for credential in self._credentials if credential.disabled_reason is None]
+        if not usable:
+            reasons = ", ".join(f"{c.name}: {c.disabled_reason}" for c in self._credentials)
+            raise RuntimeError(f"No usable Google API credentials ({reasons})")
+
+        usable.sort(
+            key=lambda credential: (
+                credential.rate_limiter.wait_time(),
+                self._config.get_search_count(credential.counter) / max(credential.search_limit, 1),
+            )
+        )
+        for credential in usable:
+            if not self._config.try_reserve_search(credential.search_limit, credential.counter):
+                continue
+            if credential.counter != SEARCHES:
+                # Keep the all-keys total used for scheduling and reporting in step
+                self._config.increment_search_count()
+            with self._lock:
+                credential.requests += 1
+            return credential
+        return None
+
+    def disable(self, credential: Credential, reason: str) -> None:
+        """Take a credential out of rotation for the rest of the run."""
+        with self._lock:
+            if credential.disabled_reason is None:
+                credential.disabled_reason = reason
+
+    def get_request_rate(self) -> float:
+        """Combined requests per period currently allowed across usable credentials."""
+        return sum(
+            credential.rate_limiter.current_limit
+            for credential in self._credentials
+            if credential.disabled_reason is None
+        )
+
+    def usage_report(self) -> list[str]:
+        lines = []
+        for credential in self._credentials:
+            status = credential.disabled_reason or "ok"
+            lines.append(
+                f"{credential.name}: {credential.requests} requests this run, "
+                f"{self._config.get_search_count(credential.counter)}/{credential.search_limit} today, "
+                f"{credential.rate_limiter.current_limit:.1f} per minute, {status}"
+            )
+        return lines
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+CUSTOM_SEARCH_ENDPOINT = "https://www.googleapis.com/customsearch/v1"
+
+
+class CustomSearchError(Exception):
+    """A non-200 response from the Custom Search JSON API."""
+
+    def __init__(
+        self,
+        status: int,
+        message: str,
+        reason: str = "",
+        retry_after: float | None = None,
+        quota_limit: str = "",
+    ) -> None:
+        super().__init__(f"{status} {message}".strip())
+        self.status = status
+        self.message = message
+        self.reason = reason
+        self.retry_after = retry_after
+        # The exceeded quota's id from the google.rpc.ErrorInfo detail, e.g. "DefaultPerDayPerProject"
+        self.quota_limit = quota_limit
+
+
+def _parse_retry_after(value: str | None) -> float | None:
+    """Parse a ``Retry-After`` header given either in seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class CustomSearchClient:
+    """
+    Lean client for the Custom Search JSON API.
+
+    Replaces ``googleapiclient.discovery.build("customsearch", "v1")``: there is
+    no discovery document to fetch and parse, and every request goes through one
+    pooled, keep-alive HTTPS session, so each page costs a single request.
+    """
+
+    def __init__(self, api_key: str, endpoint: str = CUSTOM_SEARCH_ENDPOINT, pool_size: int = 10) -> None:
+        self._api_key = api_key
+        self._endpoint = endpoint
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+
+    def list(self, q: str, cx: str, num: int, start: int) -> dict:
+        """Equivalent of ``service.cse().list(q=..., cx=..., num=..., start=...).execute()``."""
+        res = self._session.get(
+            self._endpoint,
+            params={"key": self._api_key, "cx": cx, "q": q, "num": num, "start": start},
+            timeout=30,
+        )
+        if res.status_code != 200:
+            message = res.text
+            reason = ""
+            quota_limit = ""
+            try:
+                error = res.json().get("error", {})
+                message = str(error.get("message", message))
+                errors = error.get("errors") or [{}]
+                reason = str(errors[0].get("reason", ""))
+                for detail in error.get("details") or []:
+                    quota_limit = quota_limit or str((detail.get("metadata") or {}).get("quota_limit", ""))
+            except (ValueError, AttributeError):
+                pass
+            raise CustomSearchError(
+                res.status_code,
+                message,
+                reason,
+                _parse_retry_after(res.headers.get("Retry-After")),
+                quota_limit,
+            )
+        return res.json()
@@ -1,20 +1,73 @@
+from __future__ import annotations
+
 from scopeminer import ProgramScope
 
 class DorkResults:
     
-    def __init__(self, prog_scope: ProgramScope, query: str, links: set[str]) -> None:
+    def __init__(
+        self,
+        prog_scope: ProgramScope,
+        query: str,
+        links: set[str],
+        asset_links: dict[str, set[str]] | None = None,
+    ) -> None:
+        """``asset_links`` optionally groups ``links`` by the scope asset covering them."""
         self._program_scope = prog_scope
         self._query = query
         self._links = links
+        self._asset_links = asset_links
     
     def __str__(self) -> str:
-        s = f"# Results for Program {self._program_scope._name} matching query '{self._query}'\n"
-        for link in self._links:
-            s += f"{link}\n"
-        return s
+        lines = [f"# Results for Program {self._program_scope._name} matching query '{self._query}'"]
+        if self._asset_links is None:
+            lines.extend(self._links)
+        else:
+            for asset, links in sorted(self._asset_links.items()):
+                lines.append(f"## {'*' + asset if asset.startswith('.') else asset}")
+                lines.extend(sorted(links))
+        return "\n".join(lines) + "\n"
     
     def get_program_name(self) -> str:
         return self._program_scope.get_name()
     
     def get_links(self) -> list[str]:
-        return sorted(list(self._links))
\ No newline at end of file
+        return sorted(list(self._links))
+
+    def get_asset_links(self) -> dict[str, list[str]] | None:
+        """Links grouped by the scope asset (wildcards with a leading dot) covering them, if known."""
+        if self._asset_links is None:
+            return None
+        return {asset: sorted(links) for asset, links in sorted(self._asset_links.items())}
+    
+    def merge(self, other: DorkResults) -> None:
+        """Add the links of ``other``, the same program and query from another run or shard."""
+        self._links |= other._links
+        if self._asset_links is None or other._asset_links is None:
+            # Grouping only part of the links would be misleading
+            self._asset_links = None
+            return
+        for asset, links in other._asset_links.items():
+            self._asset_links.setdefault(asset, set()).update(links)
+
+    def to_json_dict(self) -> dict:
+        json_dict = {
+            "platform": self._program_scope.get_platform(),
+            "program": self._program_scope.get_name(),
+            "query": self._query,
+            "links": self.get_links(),
+        }
+        if self._asset_links is not None:
+            json_dict["assets"] = self.get_asset_links()
+        return json_dict
+
+    @classmethod
+    def from_json_data(cls, json_data: dict) -> DorkResults:
+        prog_scope = ProgramScope(
+            platform=json_data.get("platform", "HackerOne"),
+            name=json_data["program"],
+            url_assets=set(),
+        )
+        asset_links = json_data.get("assets")
+        if asset_links is not None:
+            asset_links = {asset: set(links) for asset, links in asset_links.items()}
+        return cls(prog_scope, json_data["query"], set(json_data.get("links", [])), asset_links)
@@ -1,122 +1,567 @@
+from __future__ import annotations
+
+import random
+import sys
 import time
-from collections import deque
-from typing import Deque
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from queue import Queue
+from threading import Event, Lock, Semaphore, Thread
+from typing import Iterable, Iterator
 
+import requests
 from config import Config
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
-from scopeminer import ProgramScope
+from metrics import MetricsRegistry
+from metrics.registry import COUNT_BUCKETS
+from scopeminer import ProgramScope, ScopeCompactor, ScopeMatcher
 
+from .custom_search_client import CustomSearchError
+from .budget_scheduler import BudgetScheduler, RequestBudget
+from .credential_pool import Credential, CredentialPool, credential_failure, is_daily_quota_exhausted, is_throttled
 from .dork_result import DorkResults
+from .progress_journal import ProgressJournal
+from .response_cache import ResponseCache
 from .scope_query_factory import ScopeQueryFactory
+from .seen_links import SeenLinks
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+# Custom Search quotas are per minute
+REQUEST_WINDOW_SECONDS = 60
+# Pages kept for repeated dork strings; the least recently used are dropped first
+DEFAULT_PAGE_MEMO_MAX_ENTRIES = 10000
 
 class GoogleDorker:
-    def __init__(self, config: Config) -> None:
+    def __init__(
+        self,
+        config: Config,
+        bin_pack: bool = False,
+        response_cache: ResponseCache | None = None,
+        max_workers: int = 1,
+        journal: ProgressJournal | None = None,
+        seen_links: SeenLinks | None = None,
+        metrics: MetricsRegistry | None = None,
+        credential_pool: CredentialPool | None = None,
+        compact: bool = False,
+    ) -> None:
         self._config = config
+        self._metrics = metrics if metrics is not None else MetricsRegistry()
+        self._journal = journal
+        self._seen_links = seen_links
+        self._bin_pack = bin_pack
+        # Drop assets covered by another asset's site: operator when building a
+        # program's dorks; results are still matched against its full scope
+        self._compact = compact
+        self._response_cache = response_cache
         google_config = self._config.get_google_config()
-        self._api_key = google_config.get("api-key", "")
-        self._cse_id = google_config.get("cse-id", "")
         self._program_result_limit = google_config.get("program-result-limit", 100)
-        self._max_results_limit = google_config.get("search-limit", 10000)
         self._max_backoff_attempts = 5
         self._base_backoff_seconds = 1.5
-        self._request_window_seconds = 60
-        self._request_window_limit = 100
-        self._request_timestamps: Deque[float] = deque()
+        self._request_window_seconds = REQUEST_WINDOW_SECONDS
+        self._max_workers = max(1, max_workers)
+        # Shared by every worker thread, so each key's per-minute and daily limits hold globally.
+        # A long-lived caller may pass its own pool to keep limiters and HTTP connections warm
+        if credential_pool is None:
+            credential_pool = CredentialPool(config, self._request_window_seconds, pool_size=self._max_workers)
+        self._credential_pool = credential_pool
+        self._max_results_limit = self._credential_pool.total_limit
+        # Pages fetched during this run, keyed by (dork, start, num), bounded so
+        # long batch runs don't keep every page after its program is reported
+        self._page_memo: OrderedDict[tuple[str, int, int], tuple[list[str], int | None]] = OrderedDict()
+        self._page_memo_max_entries = google_config.get("page-memo-max-entries", DEFAULT_PAGE_MEMO_MAX_ENTRIES)
+        self._page_memo_lock = Lock()
+        # Programs whose compaction saving was counted; each is dorked once per query
+        self._compacted_programs: set[str] = set()
+        self._compacted_programs_lock = Lock()
+
+    def execute_dork(
+        self,
+        query: str,
+        prog_scope: ProgramScope,
+        budget: RequestBudget | None = None,
+    ) -> DorkResults:
+        """
+        Run every dork of one program, breadth first.
+
+        The first page of each dork is fetched before any dork's second page,
+        so a program's ``program-result-limit`` (and ``budget``, if the run is
+        scheduled) covers all of its assets rather than just the first dork.
+
+        Links outside the program's scope (``site:`` also matches subdomains
+        of exact assets, and the search engine's matching is fuzzy) are
+        dropped; the rest are grouped by the asset covering them.
 
-    def execute_dork(self, query: str, prog_scope: ProgramScope) -> DorkResults:
+        With a ``seen_links`` index only links not reported by earlier runs are
+        returned, and a dork stops paging at the first page with nothing new.
+        """
         try:
-            service = build("customsearch", "v1", developerKey=self._api_key)
             all_results = set()
             
-            dorks = ScopeQueryFactory.create_scope_querys(query, prog_scope)
-            for dork in dorks:
-                # Initial starting index is 1 (the first result)
-                start_index = 1
-                page_number = 1
-
-                while True:
-                    if len(all_results) >= self._program_result_limit or self._config.get_search_count() >= self._max_results_limit:
+            assets = prog_scope.get_sorted_url_assets()
+            if self._compact:
+                searched_assets = ScopeCompactor.compact_assets(assets)
+                with self._compacted_programs_lock:
+                    first_query = prog_scope.get_name() not in self._compacted_programs
+                    self._compacted_programs.add(prog_scope.get_name())
+                if first_query:
+                    self._metrics.inc("site_operators_saved_total", len(assets) - len(searched_assets))
+                assets = searched_assets
+            dorks = ScopeQueryFactory.create_scope_querys(query, prog_scope, self._bin_pack, assets)
+            pages_per_dork = dict.fromkeys(dorks, 0)
+            pending = [(dork, 1) for dork in dorks]
+            while pending and len(all_results) < self._program_result_limit:
+                next_round = []
+                for dork, start_index in pending:
+                    if len(all_results) >= self._program_result_limit:
                         break
+                    pages_per_dork[dork] += 1
+                    next_start = self._page_dork(
+                        prog_scope.get_name(),
+                        dork,
+                        all_results,
+                        self._program_result_limit,
+                        start_index=start_index,
+                        max_pages=1,
+                        budget=budget,
+                        query=query,
+                    )
+                    if next_start is not None:
+                        next_round.append((dork, next_start))
+                pending = next_round
+            for pages in pages_per_dork.values():
+                self._metrics.observe("pages_per_dork", pages, buckets=COUNT_BUCKETS)
+
+            asset_links, out_of_scope = ScopeMatcher([prog_scope]).group_links(all_results, prog_scope.get_name())
+            self._metrics.inc("links_out_of_scope_total", len(out_of_scope))
+            links = all_results - out_of_scope
+            if self._seen_links is not None:
+                links = self._seen_links.add(prog_scope.get_name(), query, links)
+                asset_links = {
+                    asset: asset_links[asset] & links for asset in asset_links if asset_links[asset] & links
+                }
+            return DorkResults(prog_scope, query, links, asset_links) if links else None
+        except Exception as e:
+            print("Ensure your API Keys and CSE IDs are correct and the API is enabled.", file=sys.stderr)
+            # A message makes the exit status non-zero; the cause is kept for callers reporting it
+            raise SystemExit(f"❌ An error occurred: {e}") from e
+        finally:
+            if budget is not None:
+                budget.release()
+
+    def iter_dorks(
+        self,
+        query: str,
+        prog_scopes: Iterable[ProgramScope],
+        scheduler: BudgetScheduler | None = None,
+    ) -> Iterator[DorkResults]:
+        """
+        Dork programs as they arrive from ``prog_scopes`` and yield results as they complete.
+
+        With a ``scheduler`` each program only spends its planned share of the
+        remaining daily budget.
+
+        ``prog_scopes`` may be a slow producer such as ``ScopeMiner.iter_all_scopes``;
+        it is consumed on a background thread with at most ``2 * max_workers``
+        programs in flight, so memory stays flat however many programs there are.
+        """
+        return self.iter_dork_matrix([query], prog_scopes, scheduler)
+
+    def iter_dork_matrix(
+        self,
+        queries: list[str],
+        prog_scopes: Iterable[ProgramScope],
+        scheduler: BudgetScheduler | None = None,
+    ) -> Iterator[DorkResults]:
+        """
+        Like ``iter_dorks``, but runs every query in ``queries`` against each program.
+
+        Each program is paired with every query as soon as it arrives, so the
+        whole (query x program) matrix shares one pool, rate limiter and
+        quota, and ``prog_scopes`` is still only consumed once.
+        """
+        completed: Queue = Queue()
+        in_flight = Semaphore(self._max_workers * 2)
+        stop = Event()
+        finished = object()
+
+        def run(query: str, prog_scope: ProgramScope) -> None:
+            try:
+                budget = scheduler.budget_for(prog_scope, query) if scheduler is not None else None
+                completed.put(self.execute_dork(query, prog_scope, budget))
+            except BaseException as exc:
+                completed.put(exc)
+            finally:
+                in_flight.release()
+
+        def produce(executor: ThreadPoolExecutor) -> None:
+            submitted = 0
+            try:
+                for prog_scope in prog_scopes:
+                    for query in queries:
+                        while not in_flight.acquire(timeout=0.1):
+                            if stop.is_set():
+                                return
+                        executor.submit(run, query, prog_scope)
+                        submitted += 1
+            except BaseException as exc:
+                completed.put(exc)
+            finally:
+                completed.put((finished, submitted))
+
+        executor = ThreadPoolExecutor(max_workers=self._max_workers)
+        Thread(target=produce, args=(executor,), daemon=True).start()
+        try:
+            received = 0
+            expected = None
+            while expected is None or received < expected:
+                item = completed.get()
+                if isinstance(item, tuple) and item[0] is finished:
+                    expected = item[1]
+                    continue
+                if isinstance(item, BaseException):
+                    raise item
+                received += 1
+                if item is not None:
+                    yield item
+        finally:
+            stop.set()
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def execute_packed_dorks(
+        self,
+        query: str,
+        prog_scopes: list[ProgramScope],
+        assets: list[str] | None = None,
+    ) -> list[DorkResults]:
+        """
+        Run dorks packed with assets from many programs and attribute each link back.
+
+        ``assets`` optionally replaces the union of the programs' assets as the
+        list of site: operators to search (see ``ScopeCompactor.compact_union``).
+
+        Each packed dork may collect up to ``program-result-limit`` links per
+        program it covers; every program still keeps at most
+        ``program-result-limit`` links of its own. Links are attributed to the
+        programs whose scope contains them (see ``ScopeMatcher``) and links in
+        no program's scope are dropped.
+        """
+        try:
+            owners: dict[str, list[str]] = {}
+            for prog_scope in prog_scopes:
+                for asset in prog_scope.get_url_assets():
+                    owners.setdefault(asset, []).append(prog_scope.get_name())
+            matcher = ScopeMatcher(prog_scopes)
 
-                    # Calculate how many results to request on this page
-                    remaining_to_fetch = self._program_result_limit - len(all_results)
-                    # Request up to the API's maximum (10) or the remaining amount
-                    results_to_request = min(10, remaining_to_fetch)
+            packed = ScopeQueryFactory.create_packed_querys(query, prog_scopes, assets, self._bin_pack)
+            # Searched asset -> programs it covers (several, once covered assets are compacted away)
+            searched = {asset: [asset] for _, group in packed for asset in group}
+            covered_programs: dict[str, set[str]] = {asset: set() for asset in searched}
+            for asset, names in owners.items():
+                for searched_asset in self._match_host(asset.strip("."), searched):
+                    covered_programs[searched_asset].update(names)
 
-                    result = self._execute_with_backoff(
-                        service=service,
-                        query=dork,
-                        num=results_to_request,
+            program_links: dict[str, set[str]] = {prog_scope.get_name(): set() for prog_scope in prog_scopes}
+            program_asset_links: dict[str, dict[str, set[str]]] = {name: {} for name in program_links}
+            links_lock = Lock()
+
+            def run_packed_dork(packed_dork: tuple[str, list[str]]) -> None:
+                dork, group = packed_dork
+                group_programs = {name for asset in group for name in covered_programs[asset]}
+                with links_lock:
+                    if all(len(program_links[name]) >= self._program_result_limit for name in group_programs):
+                        return
+
+                dork_results: set[str] = set()
+                pages = 0
+                start_index = 1
+                while start_index is not None:
+                    pages += 1
+                    start_index = self._page_dork(
+                        "",
+                        dork,
+                        dork_results,
+                        self._program_result_limit * len(group_programs),
                         start_index=start_index,
+                        max_pages=1,
+                        query=query,
                     )
+                self._metrics.observe("pages_per_dork", pages, buckets=COUNT_BUCKETS)
+                with links_lock:
+                    for link in sorted(dork_results):
+                        matches = matcher.match_link(link)
+                        if not matches:
+                            self._metrics.inc("links_out_of_scope_total")
+                            continue
+                        for name, asset in matches.items():
+                            if len(program_links[name]) < self._program_result_limit:
+                                program_links[name].add(link)
+                                program_asset_links[name].setdefault(asset, set()).add(link)
+
+            with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+                list(executor.map(run_packed_dork, packed))
+
+            if self._seen_links is not None:
+                for name, links in program_links.items():
+                    new_links = self._seen_links.add(name, query, links)
+                    program_links[name] = new_links
+                    program_asset_links[name] = {
+                        asset: asset_links & new_links
+                        for asset, asset_links in program_asset_links[name].items()
+                        if asset_links & new_links
+                    }
+
+            return [
+                DorkResults(
+                    prog_scope,
+                    query,
+                    program_links[prog_scope.get_name()],
+                    program_asset_links[prog_scope.get_name()],
+                )
+                for prog_scope in prog_scopes
+                if program_links[prog_scope.get_name()]
+            ]
+        except Exception as e:
+            print("Ensure your API Keys and CSE IDs are correct and the API is enabled.", file=sys.stderr)
+            # A message makes the exit status non-zero; the cause is kept for callers reporting it
+            raise SystemExit(f"❌ An error occurred: {e}") from e
+
+    @staticmethod
+    def _match_host(host: str, owners: dict[str, list[str]]) -> set[str]:
+        """
+        Return the values ``owners`` maps to for every ``site:`` operator that can return ``host``.
+
+        ``owners`` is keyed by asset; the packed-dork caller maps each searched
+        asset to itself, so this yields the searched assets covering ``host``.
+        ``site:example.com`` matches the host and all of its subdomains, as does
+        a wildcard asset ``.example.com``, so every label suffix of the host is
+        looked up in both forms.
+        """
+        host = host.rstrip(".").lower()
+        matched: set[str] = set()
+        while host:
+            matched.update(owners.get(host, ()))
+            matched.update(owners.get(f".{host}", ()))
+            _, _, host = host.partition(".")
+        return matched
+
+    def _page_dork(
+        self,
+        program: str,
+        dork: str,
+        all_results: set[str],
+        result_limit: int,
+        start_index: int = 1,
+        max_pages: int | None = None,
+        budget: RequestBudget | None = None,
+        query: str | None = None,
+    ) -> int | None:
+        """
+        Page through the results of one dork until ``result_limit`` links are collected.
+
+        Fetches at most ``max_pages`` pages starting at ``start_index`` and
+        returns the start index to continue from, or ``None`` once the dork has
+        nothing more to give (or the search limit or budget ran out). Pages
+        already recorded in the progress journal for ``program`` (empty for
+        packed dorks) are replayed instead of being requested again, as are
+        pages of the same dork string already fetched earlier in this run.
+
+        With a ``seen_links`` index, paging stops after a page whose links were
+        all reported for ``query`` by earlier runs.
+        """
+        pages = 0
+        while True:
+            if len(all_results) >= result_limit:
+                return None
+            if max_pages is not None and pages >= max_pages:
+                return start_index
+
+            # Calculate how many results to request on this page
+            remaining_to_fetch = result_limit - len(all_results)
+            # Request up to the API's maximum (10) or the remaining amount
+            results_to_request = min(10, remaining_to_fetch)
+            memo_key = (dork, start_index, results_to_request)
+
+            journaled = self._journal.get(program, dork, start_index) if self._journal else None
+            if journaled is not None:
+                links, next_start = journaled
+                self._metrics.inc("dork_pages_total", source="journal")
+            else:
+                # The same dork string may come up again for another program or query
+                with self._page_memo_lock:
+                    memoized = self._page_memo.get(memo_key)
+                    if memoized is not None:
+                        self._page_memo.move_to_end(memo_key)
+                if memoized is not None:
+                    links, next_start = memoized
+                    self._metrics.inc("dork_pages_total", source="memo")
+                else:
+                    result = self._fetch_page(dork, results_to_request, start_index, budget)
+                    if result is None:
+                        # Daily search limit or scheduled budget reached
+                        return None
 
                     # 2. Process returned items
-                    items = result.get("items", [])
-                    if items:
-                        before = len(all_results)
-                        all_results.update(item.get('link') for item in items if item.get('link'))
-                        fetched_links = len(all_results) - before
-                        if fetched_links:
-                            self._config.increment_search_count(fetched_links)
-            
-                    # 3. Check for the 'nextPage' indicator and update start index
+                    links = [item.get('link') for item in result.get("items", []) if item.get('link')]
+
+                    # 3. Check for the 'nextPage' indicator, absent at the end of the results
+                    next_start = None
                     if 'queries' in result and 'nextPage' in result['queries']:
-                        next_page_info = result['queries']['nextPage'][0]
-                        start_index = next_page_info['startIndex']
-                        page_number += 1
-                    else:
-                        # 'nextPage' is absent, meaning we have reached the end of the results
-                        break
-                
-                # for _, item in enumerate(all_results):
-                #     all_results.add(item.get('link'))
-            return DorkResults(prog_scope, query, all_results) if all_results else None
-        except Exception as e:
-            print(f"❌ An error occurred: {e}")
-            print(f"Ensure your API Key {self._api_key} and CSE ID {self._cse_id} are correct and the API is enabled.")
-            raise SystemExit()
+                        next_start = result['queries']['nextPage'][0]['startIndex']
+                    # Don't page past the estimated total, those requests can't return anything
+                    search_information = result.get("searchInformation")
+                    if next_start is not None and search_information is not None:
+                        if int(search_information.get("totalResults", 0)) < next_start:
+                            next_start = None
+
+                    with self._page_memo_lock:
+                        self._page_memo[memo_key] = (links, next_start)
+                        while len(self._page_memo) > self._page_memo_max_entries:
+                            self._page_memo.popitem(last=False)
+                    self._metrics.inc("dork_pages_total", source="search")
+                    self._metrics.observe("links_per_page", len(links), buckets=COUNT_BUCKETS)
+
+                if self._journal is not None:
+                    self._journal.record(program, dork, start_index, links, next_start)
+
+            all_results.update(links)
+            pages += 1
+            if next_start is None:
+                return None
+            if (
+                self._seen_links is not None
+                and query is not None
+                and self._seen_links.is_all_known(query, links, program or None)
+            ):
+                self._metrics.inc("dork_early_stops_total")
+                return None
+            start_index = next_start
+
+    def _fetch_page(
+        self,
+        query: str,
+        num: int,
+        start_index: int,
+        budget: RequestBudget | None = None,
+    ) -> dict | None:
+        """
+        Return one page of results, from the response cache when possible.
+
+        Only requests actually sent to the API count towards ``search-limit``
+        and ``budget``; returns ``None`` once either is used up and the page is
+        not cached.
+        """
+        if self._response_cache is not None:
+            # One lookup per page whatever the number of keys, so misses aren't counted per CSE ID
+            cached = self._response_cache.get_any(self._credential_pool.get_cse_ids(), query, start_index, num)
+            if cached is not None:
+                self._metrics.inc("cse_cache_total", result="hit")
+                return cached
+            self._metrics.inc("cse_cache_total", result="miss")
+
+        if budget is not None and not budget.try_spend():
+            self._metrics.inc("cse_skipped_total", reason="budget")
+            return None
 
-    def _execute_with_backoff(self, service, query: str, num: int, start_index: int):
-        attempt = 0
         while True:
+            # Reserve the request before sending it so concurrent workers and
+            # processes sharing the quota ledger can't overshoot any key's limit
+            credential = self._credential_pool.acquire()
+            if credential is None:
+                self._metrics.inc("cse_skipped_total", reason="search-limit")
+                return None
+
             try:
-                self._await_request_slot()
-                return (
-                    service.cse()
-                    .list(q=query, cx=self._cse_id, num=num, start=start_index)
-                    .execute()
+                result = self._execute_with_backoff(
+                    credential,
+                    query=query,
+                    num=num,
+                    start_index=start_index,
                 )
-            except HttpError as exc:
-                attempt += 1
-                message = ""
-                try:
-                    error_payload = exc.error_details or []
-                except AttributeError:
-                    error_payload = []
-                if error_payload:
-                    message = str(error_payload[0].get("message", ""))
-
-                allowed_message = "Quota exceeded for quota metric 'Queries' and limit 'Queries per minute per user'"
-                should_retry = exc.resp.status == 429 and allowed_message in message
-
-                if not should_retry or attempt >= self._max_backoff_attempts:
+            except CustomSearchError as exc:
+                reason = credential_failure(exc)
+                if reason is None:
                     raise
-                sleep_for = self._base_backoff_seconds * (2 ** (attempt - 1))
-                time.sleep(sleep_for)
+                # Fail over to the next key; raises once no key is left
+                self._credential_pool.disable(credential, reason)
+                self._metrics.inc("cse_key_failovers_total", key=credential.name)
+                print(f"ℹ️ Google API key {credential.name} {reason}, switching keys", file=sys.stderr)
+                continue
+
+            if self._response_cache is not None:
+                self._response_cache.put(credential.cse_id, query, start_index, num, result)
+            return result
 
-    def _await_request_slot(self) -> None:
-        """Throttle requests to stay within 100 queries per minute."""
+    def plan_budget(self, query: str | list[str], prog_scopes: list[ProgramScope]) -> BudgetScheduler:
+        """Spread what is left of today's ``search-limit`` fairly across ``prog_scopes`` (and queries)."""
+        return BudgetScheduler(
+            query,
+            prog_scopes,
+            budget=self._max_results_limit - self._config.get_search_count(),
+            program_result_limit=self._program_result_limit,
+            bin_pack=self._bin_pack,
+            compact=self._compact,
+        )
+
+    def _execute_with_backoff(self, credential: Credential, query: str, num: int, start_index: int):
+        """
+        Send one request with ``credential``, retrying throttling, transient 5xx and connection errors.
+
+        Throttled requests slow the key's rate limiter down and wait for the
+        server's ``Retry-After`` when given; otherwise retries back off
+        exponentially with full jitter. An exhausted daily quota is not retried.
+        """
+        client = credential.get_client()
+        attempt = 0
         while True:
-            now = time.monotonic()
-            while self._request_timestamps and now - self._request_timestamps[0] >= self._request_window_seconds:
-                self._request_timestamps.popleft()
-
-            if len(self._request_timestamps) < self._request_window_limit:
-                self._request_timestamps.append(now)
-                return
-
-            oldest = self._request_timestamps[0]
-            sleep_for = self._request_window_seconds - (now - oldest) + 0.01
-            if sleep_for > 0:
-                time.sleep(sleep_for)
+            retry_after = None
+            self._await_request_slot(credential)
+            started = time.monotonic()
+            try:
+                result = client.list(q=query, cx=credential.cse_id, num=num, start=start_index)
+                self._record_request(credential, started, 200)
+                credential.rate_limiter.on_success()
+                return result
+            except CustomSearchError as exc:
+                self._record_request(credential, started, exc.status)
+                throttled = is_throttled(exc)
+                if (exc.status not in RETRYABLE_STATUSES and not throttled) or is_daily_quota_exhausted(exc):
+                    raise
+                if throttled:
+                    credential.rate_limiter.on_throttle(exc.retry_after)
+                retry_after = exc.retry_after
+                error: Exception = exc
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                self._record_request(credential, started, "connection-error")
+                error = exc
+
+            attempt += 1
+            if attempt >= self._max_backoff_attempts:
+                raise error
+            sleep_for = retry_after or random.uniform(0, self._base_backoff_seconds * (2 ** attempt))
+            self._metrics.inc("cse_retries_total", key=credential.name)
+            self._metrics.inc("cse_backoff_seconds_total", sleep_for)
+            time.sleep(sleep_for)
+
+    def _record_request(self, credential: Credential, started: float, status: int | str) -> None:
+        self._metrics.observe("cse_request_seconds", time.monotonic() - started, key=credential.name)
+        self._metrics.inc("cse_requests_total", key=credential.name, status=status)
+
+    def get_site_operators_saved(self) -> int:
+        """site: operators scope compaction left out of the dorks built so far."""
+        return int(self._metrics.get_counter("site_operators_saved_total"))
+
+    def get_search_limit(self) -> int:
+        """Daily search limit across all API keys."""
+        return self._max_results_limit
+
+    def get_request_rate(self) -> float:
+        """Requests per minute the adaptive rate limiters of all usable keys currently allow."""
+        return self._credential_pool.get_request_rate() * 60 / self._request_window_seconds
+
+    def get_credential_usage(self) -> list[str]:
+        """One line per API key with its requests this run and today's usage."""
+        return self._credential_pool.usage_report()
+
+    def _await_request_slot(self, credential: Credential) -> None:
+        """Throttle requests to the key's adaptive per-minute rate across all worker threads."""
+        waited = credential.rate_limiter.acquire()
+        self._metrics.inc("cse_throttle_wait_seconds_total", waited)
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from threading import Lock
+
+
+class ProgressJournal:
+    """
+    Append-only journal of completed dork pages, used to resume interrupted runs.
+
+    Every fetched page is recorded as one JSON line ``{program, dork, start,
+    links, next}`` and fsync'd before the run moves on, so the journal survives
+    crashes and hard kills. With ``resume=True`` an existing journal is loaded
+    and its pages are replayed instead of being requested again. Otherwise
+    the journal starts empty, but a non-empty one left by an interrupted run
+    is only overwritten with ``overwrite=True``; ``discard`` removes the
+    journal once its run has completed.
+    """
+
+    def __init__(self, path: Path, resume: bool = False, overwrite: bool = False) -> None:
+        self._path = path
+        self._lock = Lock()
+        self._entries: dict[tuple[str, str, int], tuple[list[str], int | None]] = {}
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if not resume and not overwrite and path.exists() and path.stat().st_size > 0:
+            raise FileExistsError(f"Progress journal {path} holds an interrupted run")
+
+        if resume and path.exists():
+            with path.open("r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                        key = (record["program"], record["dork"], int(record["start"]))
+                        self._entries[key] = (list(record["links"]), record["next"])
+                    except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+                        # Torn final line from a killed run
+                        continue
+            self._file = path.open("a", encoding="utf-8")
+        else:
+            self._file = path.open("w", encoding="utf-8")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, program: str, dork: str, start: int) -> tuple[list[str], int | None] | None:
+        """Return ``(links, next start index)`` for a completed page, or ``None``."""
+        with self._lock:
+            return self._entries.get((program, dork, start))
+
+    def record(self, program: str, dork: str, start: int, links: list[str], next_start: int | None) -> None:
+        record = {"program": program, "dork": dork, "start": start, "links": links, "next": next_start}
+        with self._lock:
+            self._entries[(program, dork, start)] = (links, next_start)
+            self._file.write(json.dumps(record) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+    def discard(self) -> None:
+        """Close and delete the journal, as there is nothing left to resume."""
+        self.close()
+        self._path.unlink(missing_ok=True)
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import time
+from threading import Lock
+
+# Default ceiling of an adaptive limiter, as a multiple of its starting limit
+DEFAULT_HEADROOM = 4
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket allowing at most ``limit`` requests per ``period`` seconds.
+
+    The bucket holds ``burst`` tokens and refills at ``(limit - burst) / period``
+    tokens per second, so no sliding window of ``period`` seconds ever sees more
+    than ``limit`` requests, however many threads share it.
+    """
+
+    def __init__(self, limit: float, period: float, burst: int = 1) -> None:
+        self._period = period
+        self._capacity = float(max(1, min(burst, limit)))
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = Lock()
+        self._set_limit(limit)
+
+    def _set_limit(self, limit: float) -> None:
+        self._limit = limit
+        self._rate = max(limit - self._capacity, 1) / self._period
+
+    def wait_time(self) -> float:
+        """Seconds until a token will be available, without taking it."""
+        with self._lock:
+            now = time.monotonic()
+            tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+            if now < self._paused_until:
+                return self._paused_until - now
+            return max(0.0, (1 - tokens) / self._rate)
+
+    def acquire(self) -> float:
+        """Block until a token is available and take it; returns the seconds spent waiting."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+                self._updated = now
+                if now < self._paused_until:
+                    sleep_for = self._paused_until - now
+                elif self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                else:
+                    sleep_for = (1 - self._tokens) / self._rate
+            time.sleep(sleep_for)
+            waited += sleep_for
+
+
+class AdaptiveRateLimiter(TokenBucket):
+    """
+    Token bucket whose rate adapts to the quota the API actually grants (AIMD).
+
+    Every successful request raises the limit by ``increase`` requests per
+    period up to ``max_limit`` (by default ``DEFAULT_HEADROOM`` times the
+    starting limit, so it can probe above it); every throttled request halves it down to
+    ``min_limit`` and pauses all callers for the server's ``Retry-After``, when
+    given. The limit therefore settles just below each project's real quota.
+    """
+
+    def __init__(
+        self,
+        limit: float,
+        period: float,
+        max_limit: float | None = None,
+        min_limit: float = 1,
+        increase: float = 0.5,
+        decrease_factor: float = 0.5,
+    ) -> None:
+        super().__init__(limit, period)
+        self._max_limit = max(limit, max_limit if max_limit is not None else limit * DEFAULT_HEADROOM)
+        self._min_limit = min_limit
+        self._increase = increase
+        self._decrease_factor = decrease_factor
+
+    @property
+    def current_limit(self) -> float:
+        """Requests per period currently allowed."""
+        with self._lock:
+            return self._limit
+
+    def on_success(self) -> None:
+        with self._lock:
+            self._set_limit(min(self._max_limit, self._limit + self._increase))
+
+    def on_throttle(self, retry_after: float | None = None) -> None:
+        with self._lock:
+            self._set_limit(max(self._min_limit, self._limit * self._decrease_factor))
+            # Drop any saved-up burst so the lower rate takes effect immediately
+            self._tokens = min(self._tokens, 0.0)
+            if retry_after:
+                self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
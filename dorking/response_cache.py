@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import time
+from pathlib import Path
+from threading import Lock
+from typing import Iterable
+
+
+class ResponseCache:
+    """
+    SQLite-backed cache of Custom Search responses keyed by ``(cse-id, q, start, num)``.
+
+    Entries expire after ``ttl_seconds`` and the oldest entries are evicted once
+    more than ``max_entries`` are stored. With ``bypass=True`` lookups always
+    miss, but fresh responses are still written back.
+    """
+
+    def __init__(self, path: Path, ttl_seconds: float, max_entries: int, bypass: bool = False) -> None:
+        self._ttl_seconds = ttl_seconds
+        self._max_entries = max_entries
+        self._bypass = bypass
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Shards and the daemon may share the file; wait for other writers instead of failing
+        self._conn = sqlite3.connect(str(path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                cse_id TEXT NOT NULL,
+                query TEXT NOT NULL,
+                start INTEGER NOT NULL,
+                num INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                body TEXT NOT NULL,
+                PRIMARY KEY (cse_id, query, start, num)
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_fetched_at ON responses (fetched_at)")
+        self._conn.execute("DELETE FROM responses WHERE fetched_at < ?", (time.time() - ttl_seconds,))
+        self._conn.commit()
+
+    def get_any(self, cse_ids: Iterable[str], query: str, start: int, num: int) -> dict | None:
+        """Newest cached response for the page under any of ``cse_ids``, counted as one hit or miss."""
+        if self._bypass:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        cse_ids = list(cse_ids)
+        placeholders = ", ".join("?" * len(cse_ids))
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fetched_at, body FROM responses "
+                f"WHERE cse_id IN ({placeholders}) AND query = ? AND start = ? AND num = ? "
+                "ORDER BY fetched_at DESC LIMIT 1",
+                (*cse_ids, query, start, num),
+            ).fetchone()
+            if row is None or time.time() - row[0] >= self._ttl_seconds:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return json.loads(row[1])
+
+    def put(self, cse_id: str, query: str, start: int, num: int, response: dict) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (cse_id, query, start, num, fetched_at, body) VALUES (?, ?, ?, ?, ?, ?)",
+                (cse_id, query, start, num, time.time(), json.dumps(response)),
+            )
+            self._conn.execute(
+                """
+                DELETE FROM responses WHERE rowid IN (
+                    SELECT rowid FROM responses ORDER BY fetched_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self._max_entries,),
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
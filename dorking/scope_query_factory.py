@@ -1,3 +1,9 @@
+from __future__ import annotations
+
+import heapq
+import math
+from typing import Sequence
+
 from scopeminer import ProgramScope
 
 class ScopeQueryFactory:
@@ -7,6 +13,9 @@ class ScopeQueryFactory:
     MAX_QUERY_LENGTH = 1800          # characters (well below ~2k URL limit)
     MAX_SITE_OPERATORS = 25          # avoid too many site: operators per query
 
+    # Characters each asset adds to a dork besides its own name ("site:" and " OR ")
+    SITE_OPERATOR_OVERHEAD = len("site:") + len(" OR ")
+
     @staticmethod
     def _build_dork(assets: list[str], query: str) -> str:
         """
@@ -18,7 +27,105 @@ class ScopeQueryFactory:
         return f"({assets_clause}) AND {query.strip()}"
 
     @classmethod
-    def create_scope_querys(cls, query: str, prog_scope: ProgramScope) -> list[str]:
+    def _asset_budget(cls, query: str) -> int:
+        """
+        Characters available to the assets of one dork.
+
+        A dork is ``len("() AND ") + len(query) - len(" OR ")`` characters plus
+        ``len(asset) + SITE_OPERATOR_OVERHEAD`` per asset, so a group fits when
+        the sum of its asset costs stays within this budget.
+        """
+        return cls.MAX_QUERY_LENGTH - (len("() AND ") + len(query.strip()) - len(" OR "))
+
+    @classmethod
+    def _group_assets(cls, assets: Sequence[str], query: str, bin_pack: bool = False) -> list[list[str]]:
+        """
+        Split assets into groups that each fit into a single dork.
+
+        Respects both a max query length and a max number of site: operators.
+        Group lengths are tracked incrementally so packing is linear in the
+        number of assets. ``bin_pack`` switches from filling groups in the given
+        order to a bin packer that minimises the number of dorks.
+        """
+        if bin_pack:
+            return cls._bin_pack_assets(assets, query)
+
+        budget = cls._asset_budget(query)
+        groups: list[list[str]] = []
+        current_group: list[str] = []
+        current_length = 0
+
+        for asset in assets:
+            cost = len(asset) + cls.SITE_OPERATOR_OVERHEAD
+            # If adding this asset exceeds limits, finalize the current group and start a new one
+            if current_group and (
+                current_length + cost > budget or
+                len(current_group) >= cls.MAX_SITE_OPERATORS
+            ):
+                groups.append(current_group)
+                current_group = []
+                current_length = 0
+            # An asset too long for any dork still gets a group of its own
+            current_group.append(asset)
+            current_length += cost
+
+        # Flush any remaining group
+        if current_group:
+            groups.append(current_group)
+
+        return groups
+
+    @classmethod
+    def _bin_pack_assets(cls, assets: Sequence[str], query: str) -> list[list[str]]:
+        """
+        Pack assets into as few dorks as possible under both limits.
+
+        Starts from the lower bound on the number of dorks (by operator count
+        and by total length) and places assets longest first into the group
+        with the most room left, opening a new group only when nothing fits.
+        Spreading long assets this way leaves room for short ones in every
+        group, so both limits are filled evenly. O(n log n).
+        """
+        budget = cls._asset_budget(query)
+        costed = sorted(
+            ((len(asset) + cls.SITE_OPERATOR_OVERHEAD, asset) for asset in assets),
+            key=lambda item: (-item[0], item[1]),
+        )
+        if not costed:
+            return []
+
+        group_count = max(
+            math.ceil(len(costed) / cls.MAX_SITE_OPERATORS),
+            math.ceil(sum(cost for cost, _ in costed) / budget),
+        )
+        groups: list[list[str]] = [[] for _ in range(group_count)]
+        # Max-heap of (-remaining budget, group index) over groups below the operator limit
+        open_groups = [(-budget, index) for index in range(group_count)]
+
+        for cost, asset in costed:
+            if open_groups and -open_groups[0][0] >= cost:
+                remaining, index = heapq.heappop(open_groups)
+                remaining = -remaining
+            else:
+                index = len(groups)
+                groups.append([])
+                remaining = budget
+
+            groups[index].append(asset)
+            remaining -= cost
+            if len(groups[index]) < cls.MAX_SITE_OPERATORS:
+                heapq.heappush(open_groups, (-remaining, index))
+
+        return [sorted(group) for group in groups if group]
+
+    @classmethod
+    def create_scope_querys(
+        cls,
+        query: str,
+        prog_scope: ProgramScope,
+        bin_pack: bool = False,
+        assets: Sequence[str] | None = None,
+    ) -> list[str]:
         """
         Create a list of Google dork strings for the given ProgramScope and query.
 
@@ -26,34 +133,36 @@ class ScopeQueryFactory:
         - Each group is turned into one query of the form:
           (site:asset1 OR site:asset2 OR ...) AND <query>
         - Respects both a max query length and a max number of site: operators.
+
+        ``assets`` optionally replaces the program's assets as the sorted list
+        of site: operators to search (see ``ScopeCompactor.compact_assets``).
         """
-        assets = prog_scope.get_url_assets()  # sorted list[str]
+        if assets is None:
+            assets = prog_scope.get_sorted_url_assets()
         if not assets:
             return []
 
-        dorks: list[str] = []
-        current_group: list[str] = []
-
-        for asset in assets:
-            # Try adding this asset to the current group
-            tentative_group = current_group + [asset]
-            tentative_dork = cls._build_dork(tentative_group, query)
+        return [cls._build_dork(group, query) for group in cls._group_assets(assets, query, bin_pack)]
 
-            # If adding this asset exceeds limits, finalize the current group and start a new one
-            if (
-                len(tentative_dork) > cls.MAX_QUERY_LENGTH or
-                len(tentative_group) > cls.MAX_SITE_OPERATORS
-            ):
-                if current_group:
-                    dorks.append(cls._build_dork(current_group, query))
-                # Start a new group with just this asset
-                current_group = [asset]
-            else:
-                # Safe to add asset to current group
-                current_group = tentative_group
+    @classmethod
+    def create_packed_querys(
+        cls,
+        query: str,
+        prog_scopes: list[ProgramScope],
+        assets: list[str] | None = None,
+        bin_pack: bool = False,
+    ) -> list[tuple[str, list[str]]]:
+        """
+        Create Google dorks whose site: clauses are filled with assets from many programs.
 
-        # Flush any remaining group
-        if current_group:
-            dorks.append(cls._build_dork(current_group, query))
+        Assets shared between programs are only included once; ``assets`` may
+        supply a precomputed (e.g. compacted) asset list instead. Returns
+        ``(dork, assets)`` pairs so results can be attributed back to the
+        programs owning each asset.
+        """
+        if assets is None:
+            assets = sorted({asset for prog_scope in prog_scopes for asset in prog_scope.get_url_assets()})
+        if not assets:
+            return []
 
-        return dorks
\ No newline at end of file
+        return [(cls._build_dork(group, query), group) for group in cls._group_assets(assets, query, bin_pack)]
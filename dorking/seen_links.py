@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import time
+from pathlib import Path
+from threading import Lock
+from typing import Iterable
+
+# Bytes of each link's SHA-1 kept in the index; collisions within one
+# program and query are vanishingly unlikely at 64 bits
+LINK_HASH_BYTES = 8
+
+
+class SeenLinks:
+    """
+    Persistent index of links already reported for each program and query.
+
+    Links are stored as truncated SHA-1 hashes in SQLite under a small id for
+    each ``(program, query)`` pair, so the index stays compact however many
+    daily runs add to it. ``program=None`` in lookups matches links seen for
+    the query under any program, which is what packed dorks need.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self._lock = Lock()
+        self._key_ids: dict[tuple[str, str], int] = {}
+        self.new = 0
+        self.known = 0
+        self.stopped_early = 0
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS seen_keys (
+                id INTEGER PRIMARY KEY,
+                program TEXT NOT NULL,
+                query TEXT NOT NULL,
+                UNIQUE (program, query)
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS seen_links (
+                key_id INTEGER NOT NULL,
+                link_hash BLOB NOT NULL,
+                first_seen REAL NOT NULL,
+                PRIMARY KEY (key_id, link_hash)
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _hash(link: str) -> bytes:
+        return hashlib.sha1(link.encode("utf-8")).digest()[:LINK_HASH_BYTES]
+
+    def _key_id(self, query: str, program: str, create: bool = False) -> int | None:
+        key = (program, query)
+        if key not in self._key_ids:
+            row = self._conn.execute(
+                "SELECT id FROM seen_keys WHERE program = ? AND query = ?", key
+            ).fetchone()
+            if row is None:
+                if not create:
+                    return None
+                row = (self._conn.execute("INSERT INTO seen_keys (program, query) VALUES (?, ?)", key).lastrowid,)
+            self._key_ids[key] = row[0]
+        return self._key_ids[key]
+
+    def get_known(self, query: str, links: Iterable[str], program: str | None = None) -> set[str]:
+        """Return the subset of ``links`` already seen for ``query`` (and ``program``, if given)."""
+        by_hash = {self._hash(link): link for link in set(links)}
+        hashes = list(by_hash)
+        known: set[str] = set()
+        with self._lock:
+            if program is None:
+                key_clause, key_params = "key_id IN (SELECT id FROM seen_keys WHERE query = ?)", (query,)
+            else:
+                key_id = self._key_id(query, program)
+                if key_id is None:
+                    return known
+                key_clause, key_params = "key_id = ?", (key_id,)
+            # Stay well below SQLite's limit on bound parameters
+            for offset in range(0, len(hashes), 500):
+                chunk = hashes[offset:offset + 500]
+                rows = self._conn.execute(
+                    f"SELECT link_hash FROM seen_links WHERE {key_clause} "
+                    f"AND link_hash IN ({','.join('?' * len(chunk))})",
+                    (*key_params, *chunk),
+                ).fetchall()
+                known.update(by_hash[row[0]] for row in rows)
+        return known
+
+    def is_all_known(self, query: str, links: list[str], program: str | None = None) -> bool:
+        """
+        Return whether a non-empty result page holds nothing but known links.
+
+        Search results are ranked consistently, so a page with nothing new
+        means later pages are very unlikely to have anything new either.
+        """
+        if not links or len(self.get_known(query, links, program)) < len(set(links)):
+            return False
+        with self._lock:
+            self.stopped_early += 1
+        return True
+
+    def add(self, program: str, query: str, links: Iterable[str]) -> set[str]:
+        """Record ``links`` as seen and return the ones that weren't seen before."""
+        links = set(links)
+        new_links = links - self.get_known(query, links, program)
+        with self._lock:
+            key_id = self._key_id(query, program, create=True)
+            now = time.time()
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO seen_links (key_id, link_hash, first_seen) VALUES (?, ?, ?)",
+                [(key_id, self._hash(link), now) for link in new_links],
+            )
+            self._conn.commit()
+            self.new += len(new_links)
+            self.known += len(links) - len(new_links)
+        return new_links
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
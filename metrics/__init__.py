@@ -0,0 +1,3 @@
+from .registry import Histogram, MetricsRegistry
+
+__all__ = ["Histogram", "MetricsRegistry"]
@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import bisect
+import json
+import math
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from threading import Lock
+from typing import Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+# Upper bounds of the histogram buckets; latencies are in seconds, counts in units
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+LabelKey = tuple[tuple[str, str], ...]
+
+
+def _label_key(labels: dict[str, object]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+class Histogram:
+    """Cumulative-bucket histogram, as used by Prometheus."""
+
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """Estimate the ``q`` quantile as the upper bound of the bucket it falls in."""
+        if not self.count:
+            return 0.0
+        rank = math.ceil(q * self.count)
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return self.buckets[index] if index < len(self.buckets) else math.inf
+        return math.inf
+
+    def to_json_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "buckets": {str(bound): count for bound, count in zip(self.buckets, self.counts)},
+            "overflow": self.counts[-1],
+        }
+
+
+class MetricsRegistry:
+    """
+    Thread-safe counters and histograms describing one run.
+
+    Metrics are identified by name plus keyword labels, e.g.
+    ``inc("cse_requests_total", status=200)``. Counter names end in
+    ``_total``; anything else set with ``set`` is a gauge. The registry can be rendered
+    as a short human summary, as JSON, or in the Prometheus text exposition
+    format for node_exporter's textfile collector.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._counters: dict[str, dict[LabelKey, float]] = {}
+        self._histograms: dict[str, dict[LabelKey, Histogram]] = {}
+        self._histogram_buckets: dict[str, tuple[float, ...]] = {}
+
+    def inc(self, name: str, amount: float = 1, **labels: object) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def set(self, name: str, value: float, **labels: object) -> None:
+        """Set a gauge; rendered like a counter but not suffixed ``_total``."""
+        with self._lock:
+            self._counters.setdefault(name, {})[_label_key(labels)] = value
+
+    def observe(self, name: str, value: float, buckets: tuple[float, ...] = LATENCY_BUCKETS, **labels: object) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            buckets = self._histogram_buckets.setdefault(name, buckets)
+            series = self._histograms.setdefault(name, {})
+            if key not in series:
+                series[key] = Histogram(buckets)
+            series[key].observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels: object) -> Iterator[None]:
+        """Add the time spent in the ``with`` block to the counter ``name``."""
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.inc(name, time.monotonic() - started, **labels)
+
+    def time_iter(self, iterable: Iterable[T], name: str, **labels: object) -> Iterator[T]:
+        """Yield from ``iterable``, adding the time spent producing each item to the counter ``name``."""
+        iterator = iter(iterable)
+        while True:
+            started = time.monotonic()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.inc(name, time.monotonic() - started, **labels)
+                return
+            self.inc(name, time.monotonic() - started, **labels)
+            yield item
+
+    def get_counter(self, name: str, **labels: object) -> float:
+        """Return the sum of the series of ``name`` carrying all of ``labels``."""
+        wanted = set(_label_key(labels))
+        with self._lock:
+            return sum(value for key, value in self._counters.get(name, {}).items() if wanted.issubset(key))
+
+    def get_histogram(self, name: str) -> Histogram:
+        """Return all series of ``name`` merged into one histogram."""
+        with self._lock:
+            merged = Histogram(self._histogram_buckets.get(name, LATENCY_BUCKETS))
+            for histogram in self._histograms.get(name, {}).values():
+                merged.counts = [a + b for a, b in zip(merged.counts, histogram.counts)]
+                merged.count += histogram.count
+                merged.sum += histogram.sum
+            return merged
+
+    def to_json_dict(self) -> dict:
+        def series_name(key: LabelKey) -> str:
+            return ",".join(f"{label}={value}" for label, value in key)
+
+        with self._lock:
+            return {
+                "counters": {
+                    name: {series_name(key): value for key, value in sorted(series.items())}
+                    for name, series in sorted(self._counters.items())
+                },
+                "histograms": {
+                    name: {series_name(key): histogram.to_json_dict() for key, histogram in sorted(series.items())}
+                    for name, series in sorted(self._histograms.items())
+                },
+            }
+
+    def to_prometheus(self, prefix: str = "scope_dorker_") -> str:
+        def render_labels(key: LabelKey, extra: tuple[tuple[str, str], ...] = ()) -> str:
+            pairs = key + extra
+            if not pairs:
+                return ""
+            escaped = (
+                label + '="' + value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+                for label, value in pairs
+            )
+            return "{" + ",".join(escaped) + "}"
+
+        lines: list[str] = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                kind = "counter" if name.endswith("_total") else "gauge"
+                lines.append(f"# TYPE {prefix}{name} {kind}")
+                for key, value in sorted(series.items()):
+                    lines.append(f"{prefix}{name}{render_labels(key)} {value:g}")
+            for name, series in sorted(self._histograms.items()):
+                lines.append(f"# TYPE {prefix}{name} histogram")
+                for key, histogram in sorted(series.items()):
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        lines.append(f"{prefix}{name}_bucket{render_labels(key, (('le', f'{bound:g}'),))} {cumulative}")
+                    lines.append(f"{prefix}{name}_bucket{render_labels(key, (('le', '+Inf'),))} {histogram.count}")
+                    lines.append(f"{prefix}{name}_sum{render_labels(key)} {histogram.sum:g}")
+                    lines.append(f"{prefix}{name}_count{render_labels(key)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: Path) -> None:
+        """
+        Export to ``path``: Prometheus text format for ``.prom`` files, JSON otherwise.
+
+        The file is replaced atomically so a collector never reads a partial export.
+        """
+        content = self.to_prometheus() if path.suffix == ".prom" else json.dumps(self.to_json_dict(), indent=2)
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with tmp_path.open("w", encoding="utf-8") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        except OSError as exc:
+            raise SystemExit(f"Error writing metrics to {path}: {exc}")
@@ -1,9 +1,21 @@
+from __future__ import annotations
+
 import argparse
 import base64
+import hashlib
 import json
-from config import Config, ConfigFactory
-from dorking import GoogleDorker
-from scopeminer import H1ScopeMiner, ProgramScope
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Iterator, TextIO
+from daemon import DAEMON_TOKEN_FILE, DEFAULT_DAEMON_PORT, DEFAULT_DAEMON_URL
+from metrics import MetricsRegistry
+
+# Everything else is imported on the code path that needs it, so quick runs
+# (--help, scope exports, bad arguments) don't pay for the HTTP stack
+if TYPE_CHECKING:
+    from config import Config
+    from dorking import DorkResults, GoogleDorker, ProgressJournal, ResponseCache
+    from scopeminer import ProgramScope, ScopeCache, ScopeMiner, Shard
 
 
 def _build_auth_header(config: Config) -> str:
@@ -12,6 +24,15 @@ def _build_auth_header(config: Config) -> str:
     return base64.b64encode(credentials.encode("utf-8")).decode("ascii")
 
 
+def _parse_shard(text: str) -> Shard:
+    from scopeminer import Shard
+
+    try:
+        return Shard.parse(text)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(str(exc))
+
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description="Generate Google dorks from HackerOne program scopes"
@@ -21,6 +42,11 @@ def parse_args() -> argparse.Namespace:
         "--query",
         help="The query portion of the dork to AND with the scoped site: clauses",
     )
+    parser.add_argument(
+        "-qf",
+        "--query-file",
+        help="File of queries, one per line, each run against every program in one pass",
+    )
     parser.add_argument(
         "-eos",
         "--exclude-out-of-scope",
@@ -43,95 +69,609 @@ def parse_args() -> argparse.Namespace:
         "--input-scopes",
         help="Input the program scopes from a file",
     )
+    parser.add_argument(
+        "-sd",
+        "--scope-dump",
+        nargs="+",
+        help="Read program scopes from bounty-targets-data dumps (e.g. hackerone_data.json) instead of the HackerOne API",
+    )
+    parser.add_argument(
+        "-of",
+        "--output-format",
+        choices=["text", "jsonl"],
+        default="text",
+        help="Print results as text or as one JSON object per program per line",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        help="Write results to this file instead of stdout",
+    )
+    parser.add_argument(
+        "--shard",
+        type=_parse_shard,
+        help="Only dork shard i of N (e.g. 2/4), partitioning programs by a stable hash of their name; "
+        "--output, --journal and the scope cache get a per-shard file name",
+    )
+    parser.add_argument(
+        "--merge",
+        nargs="+",
+        help="Merge jsonl result files (e.g. one per shard) into one deduplicated report instead of dorking",
+    )
+    parser.add_argument(
+        "--pack",
+        action="store_true",
+        help="Pack assets from many programs into each dork and attribute results back to programs",
+    )
+    parser.add_argument(
+        "--bin-pack",
+        action="store_true",
+        help="Pack assets into as few dorks as possible instead of filling them in sorted order",
+    )
+    parser.add_argument(
+        "--no-compact",
+        action="store_true",
+        help="Do not drop assets already covered by another asset (e.g. a wildcard) before building dorks",
+    )
+    parser.add_argument(
+        "--bypass-cache",
+        action="store_true",
+        help="Always query the Custom Search API instead of reusing cached responses",
+    )
+    parser.add_argument(
+        "--schedule",
+        action="store_true",
+        help="Plan the run up front and spread the remaining daily search budget fairly across programs",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Resume an interrupted run, skipping dork pages already recorded in the progress journal",
+    )
+    parser.add_argument(
+        "--fresh",
+        action="store_true",
+        help="Discard the progress journal of an interrupted run and start over",
+    )
+    parser.add_argument(
+        "--journal",
+        help="Path of the progress journal (defaults to one per set of queries and scope source "
+        "under ~/.config/scope-dorker/progress/)",
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Ignore the local scope cache and re-mine every program from HackerOne",
+    )
+    parser.add_argument(
+        "--max-age",
+        type=float,
+        help="Maximum age in hours of cached program scopes before they are revalidated",
+    )
+    parser.add_argument(
+        "--new-only",
+        action="store_true",
+        help="Only print links not reported by earlier runs, and stop paging a dork once a page has nothing new",
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Print request counts, latencies, retries and time spent per stage to stderr at the end of the run",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        help="Write run metrics to this file, in Prometheus text format if it ends in .prom and as JSON otherwise",
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Run as a daemon that accepts dork jobs over a local HTTP API, keeping scopes, caches and rate limits warm",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=DEFAULT_DAEMON_PORT,
+        help="Port the daemon listens on (127.0.0.1 only)",
+    )
+    parser.add_argument(
+        "--concurrent-jobs",
+        type=int,
+        default=1,
+        help="Number of daemon jobs run at the same time",
+    )
+    parser.add_argument(
+        "--daemon-url",
+        nargs="?",
+        const=DEFAULT_DAEMON_URL,
+        help=f"Send the queries to a running daemon and print its results (defaults to {DEFAULT_DAEMON_URL})",
+    )
+    parser.add_argument(
+        "--priority",
+        type=int,
+        default=0,
+        help="Priority of the job sent with --daemon-url; higher runs first",
+    )
     
     return parser.parse_args()
 
 
-def load_program_scopes(
+def build_miner(
     args: argparse.Namespace,
-    miner: H1ScopeMiner,
-    auth_header: str,
-) -> list[ProgramScope]:
-    program_scopes: list[ProgramScope] = []
+    config: Config,
+    metrics: MetricsRegistry,
+) -> tuple[ScopeMiner, ScopeCache | None]:
+    """Return the miner for ``--scope-dump`` or HackerOne, plus the scope cache it uses."""
+    if args.scope_dump:
+        from scopeminer import BountyTargetsScopeMiner
+
+        return BountyTargetsScopeMiner(Path(path) for path in args.scope_dump), None
+
+    from scopeminer import H1ScopeMiner, ScopeCache
+
+    h1_config = config.get_hackerone_config()
+    max_age_hours = args.max_age if args.max_age is not None else h1_config.get("cache-max-age-hours", 24)
+    scope_cache_path = config.get_config_dir() / "scope-cache.json"
+    if args.shard is not None:
+        # Shards running side by side on one host would overwrite each other's cache
+        scope_cache_path = args.shard.path_for(scope_cache_path)
+    scope_cache = ScopeCache(
+        scope_cache_path,
+        max_age_seconds=max_age_hours * 3600,
+        refresh=args.refresh,
+    )
+    miner = H1ScopeMiner(
+        max_workers=h1_config.get("max-workers", 8),
+        cache=scope_cache,
+        metrics=metrics,
+        api_url=h1_config.get("api-url"),
+        shard=args.shard,
+    )
+    return miner, scope_cache
+
+
+def open_response_cache(args: argparse.Namespace, config: Config) -> ResponseCache:
+    from dorking import ResponseCache
+
+    google_config = config.get_google_config()
+    return ResponseCache(
+        config.get_config_dir() / "response-cache.db",
+        ttl_seconds=google_config.get("cache-ttl-hours", 24) * 3600,
+        max_entries=google_config.get("cache-max-entries", 10000),
+        bypass=args.bypass_cache,
+    )
 
+
+def iter_program_scopes(
+    args: argparse.Namespace,
+    miner: ScopeMiner | None,
+    auth_header: str,
+) -> Iterator[ProgramScope]:
+    """Yield each program (of ``--shard``, if given) as soon as it is read or mined."""
+    shard = args.shard
     if args.input_scopes:
-        try:
-            with open(args.input_scopes, "r", encoding="utf-8") as file_handle:
-                json_data = json.load(file_handle)
-        except OSError:
-            raise SystemExit(f"Error reading input scopes from {args.input_scopes}")
-
-        for prog_scope_data in json_data:
-            program_scopes.append(ProgramScope.from_json_data(prog_scope_data))
-        return program_scopes
-
-    if args.programs:
-        for program_id in args.programs:
-            program_scopes.append(
-                miner.get_program_scopes(
-                    auth_header,
-                    program_id,
-                    include_oos=not args.exclude_out_of_scope,
-                )
-            )
+        from scopeminer import read_scope_file
+
+        program_scopes = read_scope_file(Path(args.input_scopes))
+    elif args.programs:
+        program_scopes = miner.iter_program_scopes(
+            auth_header,
+            shard.filter_names(args.programs) if shard is not None else args.programs,
+            include_oos=not args.exclude_out_of_scope,
+        )
     else:
-        program_scopes.extend(
-            miner.get_all_scopes(
-                auth_header,
-                include_oos=not args.exclude_out_of_scope,
-            )
+        program_scopes = miner.iter_all_scopes(
+            auth_header,
+            include_oos=not args.exclude_out_of_scope,
+            # Exported scope files must not depend on which request finished first
+            ordered=bool(args.output_scopes),
         )
-
-    return program_scopes
+    if shard is not None:
+        program_scopes = shard.filter_scopes(program_scopes)
+    yield from program_scopes
 
 
 def output_program_scopes(
     args: argparse.Namespace,
-    program_scopes: list[ProgramScope],
+    program_scopes: Iterable[ProgramScope],
 ) -> None:
+    from scopeminer import write_scope_file
+
+    count = write_scope_file(Path(args.output_scopes), program_scopes)
+    print(f"ℹ️ Wrote {count} program scopes to {args.output_scopes}", file=sys.stderr)
+
+
+def read_queries(args: argparse.Namespace) -> list[str]:
+    """Collect ``--query`` and the lines of ``--query-file``, normalising whitespace and dropping duplicates."""
+    queries = [args.query] if args.query else []
+    if args.query_file:
+        try:
+            with open(args.query_file, "r", encoding="utf-8") as file_handle:
+                queries.extend(line for line in file_handle if not line.lstrip().startswith("#"))
+        except OSError as exc:
+            raise SystemExit(f"Error reading queries from {args.query_file}: {exc}")
+
+    # Queries differing only in whitespace would build identical dork strings
+    return list(dict.fromkeys(" ".join(query.split()) for query in queries if query.strip()))
+
+
+def format_result(result: DorkResults, output_format: str) -> str:
+    if output_format == "jsonl":
+        return json.dumps(result.to_json_dict())
+    return f"{result}"
+
+
+def default_journal_path(args: argparse.Namespace, queries: list[str], config: Config) -> Path:
+    """One journal per set of queries and scope source, so unrelated runs never share one."""
+    run_key = {
+        "queries": sorted(queries),
+        "input_scopes": str(Path(args.input_scopes).resolve()) if args.input_scopes else None,
+        "scope_dump": sorted(str(Path(path).resolve()) for path in args.scope_dump or []),
+        "programs": sorted(args.programs or []),
+        "exclude_out_of_scope": args.exclude_out_of_scope,
+        "pack": args.pack,
+    }
+    digest = hashlib.sha1(json.dumps(run_key, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+    return config.get_config_dir() / "progress" / f"{digest}.jsonl"
+
+
+def open_journal(args: argparse.Namespace, queries: list[str], config: Config) -> ProgressJournal:
+    from dorking import ProgressJournal
+
+    journal_path = Path(args.journal) if args.journal else default_journal_path(args, queries, config)
+    if args.shard is not None:
+        journal_path = args.shard.path_for(journal_path)
+    try:
+        journal = ProgressJournal(journal_path, resume=args.resume, overwrite=args.fresh)
+    except FileExistsError:
+        raise SystemExit(
+            f"Error: {journal_path} holds the progress of an interrupted run; "
+            "pass --resume to continue it or --fresh to start over."
+        )
+    if args.resume:
+        print(f"ℹ️ Resuming with {len(journal)} dork pages already completed", file=sys.stderr)
+    return journal
+
+
+def open_output(args: argparse.Namespace) -> TextIO:
+    """Open ``--output`` (per shard with ``--shard``) for writing, or return stdout."""
+    if not args.output:
+        return sys.stdout
+    path = Path(args.output)
+    if args.shard is not None:
+        path = args.shard.path_for(path)
     try:
-        with open(args.output_scopes, "w", encoding="utf-8") as file_handle:
-            json.dump([scope.to_json_dict() for scope in program_scopes], file_handle, indent=4)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        output = path.open("w", encoding="utf-8")
     except OSError as exc:
-        raise SystemExit(f"Error writing output scopes to {args.output_scopes}: {exc}")
+        raise SystemExit(f"Error writing results to {path}: {exc}")
+    print(f"ℹ️ Writing results to {path}", file=sys.stderr)
+    return output
+
+
+def merge_results(args: argparse.Namespace) -> None:
+    """Combine the results of several jsonl files, such as one per shard, into one report."""
+    from dorking import DorkResults
+
+    merged: dict[tuple[str, str, str], DorkResults] = {}
+    for path in args.merge:
+        try:
+            with open(path, "r", encoding="utf-8") as file_handle:
+                for line_number, line in enumerate(file_handle, start=1):
+                    if not line.strip():
+                        continue
+                    try:
+                        json_data = json.loads(line)
+                        key = (json_data.get("platform", "HackerOne"), json_data["program"], json_data["query"])
+                        result = DorkResults.from_json_data(json_data)
+                    except (json.JSONDecodeError, KeyError, TypeError, AttributeError):
+                        raise SystemExit(
+                            f"Error: {path}:{line_number} is not a jsonl result; "
+                            "write the results to merge with --output-format jsonl"
+                        )
+                    if key in merged:
+                        merged[key].merge(result)
+                    else:
+                        merged[key] = result
+        except OSError as exc:
+            raise SystemExit(f"Error reading results from {path}: {exc}")
+
+    output = open_output(args)
+    link_count = 0
+    for key in sorted(merged):
+        link_count += len(merged[key].get_links())
+        print(format_result(merged[key], args.output_format), file=output)
+    if output is not sys.stdout:
+        output.close()
+    print(
+        f"ℹ️ Merged {len(args.merge)} files into {len(merged)} results with {link_count} unique links",
+        file=sys.stderr,
+    )
 
 
 def generate_dorks(
     args: argparse.Namespace,
-    program_scopes: list[ProgramScope],
+    queries: list[str],
+    program_scopes: Iterable[ProgramScope],
     dorker: GoogleDorker,
+    output: TextIO = sys.stdout,
 ) -> None:
-    if not args.query:
-        raise SystemExit("Error: A query must be provided when dorking scopes.")
+    """
+    Dork the programs and print each program's results as soon as they complete.
 
-    dork_results = []
-    for program_scope in program_scopes:
-        results = dorker.execute_dork(args.query, program_scope)
-        if results is not None:
-            dork_results.append(results)
+    Every query is run against every program. Programs are dorked while
+    ``program_scopes`` is still being produced, except with ``--pack`` or
+    ``--schedule``, which need every scope up front.
+    """
+    saved = None
+    if args.pack:
+        from scopeminer import ScopeCompactor
+
+        program_scopes = list(program_scopes)
+        assets = None
+        if not args.no_compact:
+            assets, saved = ScopeCompactor.compact_union(program_scopes)
+        dork_results = (
+            result for query in queries for result in dorker.execute_packed_dorks(query, program_scopes, assets)
+        )
+    else:
+        scheduler = None
+        if args.schedule:
+            # Planning needs every program's dork count up front
+            program_scopes = list(program_scopes)
+            scheduler = dorker.plan_budget(queries, program_scopes)
+            print(
+                f"ℹ️ Budget plan: {scheduler.planned_requests()} requests across {len(program_scopes)} programs"
+                + (f" and {len(queries)} queries" if len(queries) > 1 else ""),
+                file=sys.stderr,
+            )
+        dork_results = dorker.iter_dork_matrix(queries, program_scopes, scheduler)
 
     for result in dork_results:
-        print(result)
+        print(format_result(result, args.output_format), file=output, flush=True)
+
+    if not args.no_compact:
+        if saved is None:
+            # Compacted by the dorker as it builds each program's dorks
+            saved = dorker.get_site_operators_saved()
+        print(f"ℹ️ Scope compaction saved {saved} site: operators", file=sys.stderr)
+
+
+def submit_to_daemon(args: argparse.Namespace) -> None:
+    """Run the queries as a daemon job and print its results as they complete."""
+    queries = read_queries(args)
+    if not queries:
+        raise SystemExit("Error: A query must be provided when dorking scopes.")
+
+    from config import ConfigFactory
+    from daemon import DaemonClient, load_token
+    from dorking import DorkResults
+
+    token = load_token(ConfigFactory.get_config().get_config_dir() / DAEMON_TOKEN_FILE)
+    client = DaemonClient(args.daemon_url, token=token)
+    job = client.submit(
+        queries,
+        programs=args.programs,
+        priority=args.priority,
+        new_only=args.new_only,
+        pack=args.pack,
+    )
+    print(f"ℹ️ Submitted job {job['id']} ({job['queued_ahead']} jobs queued ahead)", file=sys.stderr)
+    for result in client.iter_results(job["id"]):
+        print(format_result(DorkResults.from_json_data(result), args.output_format), flush=True)
+    job = client.get_job(job["id"])
+    if job["status"] != "done":
+        raise SystemExit(f"Job {job['id']} {job['status']}: {job.get('error', '')}")
+
+
+def serve(
+    args: argparse.Namespace,
+    config: Config,
+    miner: ScopeMiner | None,
+    auth_header: str,
+    scope_cache: ScopeCache | None,
+    metrics: MetricsRegistry,
+) -> None:
+    """Run the daemon until interrupted."""
+    from daemon import DorkDaemon, load_token
+    from dorking import SeenLinks
+    from scopeminer import read_scope_file
+
+    include_oos = not args.exclude_out_of_scope
+    if args.input_scopes or args.scope_dump:
+        # Scope files and dumps don't change while the daemon runs, so read them once
+        loaded = {
+            prog_scope.get_name(): prog_scope
+            for prog_scope in (
+                read_scope_file(Path(args.input_scopes))
+                if args.input_scopes
+                else miner.iter_all_scopes(auth_header, include_oos=include_oos)
+            )
+        }
+        print(f"ℹ️ Loaded {len(loaded)} program scopes", file=sys.stderr)
+
+        def scope_source(programs: list[str] | None) -> Iterable[ProgramScope]:
+            if programs is None:
+                return list(loaded.values())
+            missing = [name for name in programs if name not in loaded]
+            if missing:
+                raise SystemExit(f"Unknown programs: {', '.join(missing)}")
+            return [loaded[name] for name in programs]
+    else:
+        # The scope cache keeps mined scopes in memory and revalidates them after --max-age
+
+        def scope_source(programs: list[str] | None) -> Iterable[ProgramScope]:
+            if programs is None:
+                return miner.iter_all_scopes(auth_header, include_oos=include_oos)
+            return miner.iter_program_scopes(auth_header, programs, include_oos=include_oos)
+
+    seen_links = SeenLinks(config.get_config_dir() / "seen-links.db")
+    dork_daemon = DorkDaemon(
+        config,
+        scope_source,
+        response_cache=open_response_cache(args, config),
+        seen_links=seen_links,
+        scope_cache=scope_cache,
+        metrics=metrics,
+        bin_pack=args.bin_pack,
+        compact=not args.no_compact,
+        max_workers=config.get_google_config().get("max-workers", 4),
+        concurrent_jobs=args.concurrent_jobs,
+        token=load_token(config.get_config_dir() / DAEMON_TOKEN_FILE, create=True),
+    )
+    dork_daemon.serve(port=args.port)
+    seen_links.close()
+
+
+def print_stats(metrics: MetricsRegistry) -> None:
+    """Summarise the run's metrics on stderr."""
+    h1_latency = metrics.get_histogram("h1_request_seconds")
+    cse_latency = metrics.get_histogram("cse_request_seconds")
+    lines = [
+        f"Stages: scopes {metrics.get_counter('stage_seconds_total', stage='scopes'):.1f}s, "
+        f"total {metrics.get_counter('stage_seconds_total', stage='total'):.1f}s",
+        f"HackerOne: {h1_latency.count} requests, {metrics.get_counter('h1_retries_total'):g} retries, "
+        f"p50 {h1_latency.quantile(0.5):g}s, p95 {h1_latency.quantile(0.95):g}s, "
+        f"scope cache {metrics.get_counter('h1_scope_cache_total', result='fresh'):g} fresh / "
+        f"{metrics.get_counter('h1_scope_cache_total', result='revalidated'):g} revalidated / "
+        f"{metrics.get_counter('h1_scope_cache_total', result='miss'):g} mined "
+        f"({metrics.get_counter('h1_scope_changes_total'):g} changed since cached)",
+        f"Custom Search: {cse_latency.count} requests "
+        f"({metrics.get_counter('cse_requests_total', status=200):g} billed, "
+        f"{metrics.get_counter('cse_retries_total'):g} retries), "
+        f"p50 {cse_latency.quantile(0.5):g}s, p95 {cse_latency.quantile(0.95):g}s",
+        f"Waiting: {metrics.get_counter('cse_throttle_wait_seconds_total'):.1f}s for the rate limiter, "
+        f"{metrics.get_counter('cse_backoff_seconds_total'):.1f}s backing off",
+        f"Pages: {metrics.get_counter('dork_pages_total', source='search'):g} searched, "
+        f"{metrics.get_counter('cse_cache_total', result='hit'):g} from cache, "
+        f"{metrics.get_counter('dork_pages_total', source='journal'):g} from the journal, "
+        f"{metrics.get_counter('dork_pages_total', source='memo'):g} repeated dorks, "
+        f"{metrics.get_histogram('pages_per_dork').sum / max(metrics.get_histogram('pages_per_dork').count, 1):.2f} per dork, "
+        f"{metrics.get_histogram('links_per_page').sum / max(metrics.get_histogram('links_per_page').count, 1):.2f} links per page, "
+        f"{metrics.get_counter('links_out_of_scope_total'):g} out-of-scope links dropped",
+        f"Quota: {metrics.get_counter('search_quota_used'):g} of {metrics.get_counter('search_quota_limit'):g} searches used today",
+    ]
+    for line in lines:
+        print(f"ℹ️ {line}", file=sys.stderr)
+
+
+def dork_programs(
+    args: argparse.Namespace,
+    queries: list[str],
+    program_scopes: Iterable[ProgramScope],
+    config: Config,
+    metrics: MetricsRegistry,
+) -> None:
+    """Dork the programs with the run's journal, caches and output, then report on stderr."""
+    from dorking import GoogleDorker, SeenLinks
+
+    if args.shard is not None:
+        print(f"ℹ️ Running shard {args.shard}", file=sys.stderr)
+    journal = open_journal(args, queries, config)
+    response_cache = open_response_cache(args, config)
+    seen_links = SeenLinks(config.get_config_dir() / "seen-links.db") if args.new_only else None
+    dorker = GoogleDorker(
+        config,
+        bin_pack=args.bin_pack,
+        response_cache=response_cache,
+        max_workers=config.get_google_config().get("max-workers", 4),
+        journal=journal,
+        seen_links=seen_links,
+        metrics=metrics,
+        compact=not args.no_compact,
+    )
+    output = open_output(args)
+    try:
+        generate_dorks(args, queries, program_scopes, dorker, output)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        # Failed runs report the quota they used too
+        metrics.set("search_quota_used", config.get_search_count())
+        metrics.set("search_quota_limit", dorker.get_search_limit())
+    # Only an interrupted run leaves its journal behind
+    journal.discard()
+    if seen_links is not None:
+        print(
+            f"ℹ️ Seen links: {seen_links.new} new, {seen_links.known} already seen, "
+            f"{seen_links.stopped_early} dorks stopped early",
+            file=sys.stderr,
+        )
+        seen_links.close()
+    print(
+        f"ℹ️ Response cache: {response_cache.hits} hits, {response_cache.misses} misses",
+        file=sys.stderr,
+    )
+    print(f"ℹ️ Request rate: {dorker.get_request_rate():.1f} per minute", file=sys.stderr)
+    for line in dorker.get_credential_usage():
+        print(f"ℹ️ API key {line}", file=sys.stderr)
 
 
 def main() -> None:
     args = parse_args()
-    config = ConfigFactory.get_config()
+    metrics = MetricsRegistry()
+    failed = False
     try:
-        auth_header = _build_auth_header(config)
-        miner = H1ScopeMiner()
-        dorker = GoogleDorker(config)
+        with metrics.timer("stage_seconds_total", stage="total"):
+            run(args, metrics)
+    except BaseException as exc:
+        # sys.exit() without an error code is still a successful run
+        if not (isinstance(exc, SystemExit) and exc.code in (None, 0)):
+            failed = True
+            metrics.inc("run_failures_total", reason=type(exc.__cause__ or exc).__name__)
+        raise
+    finally:
+        # Failed runs are the ones monitoring most needs to see
+        metrics.set("run_failed", int(failed))
+        if args.stats:
+            print_stats(metrics)
+        if args.metrics_file:
+            metrics.write(Path(args.metrics_file))
+
+
+def run(args: argparse.Namespace, metrics: MetricsRegistry) -> None:
+    if args.merge:
+        merge_results(args)
+        return
+    if args.schedule and args.pack:
+        # Packed dorks cover many programs at once, so per-program budgets can't apply
+        raise SystemExit("Error: --schedule can't be combined with --pack.")
+    if args.resume and args.fresh:
+        raise SystemExit("Error: --resume and --fresh can't be combined.")
+    if args.shard is not None and (args.serve or args.daemon_url):
+        raise SystemExit("Error: --shard can't be combined with --serve or --daemon-url.")
+    if args.daemon_url:
+        submit_to_daemon(args)
+        return
 
-        program_scopes = load_program_scopes(args, miner, auth_header)
+    queries: list[str] = []
+    if not args.output_scopes and not args.serve:
+        # Fail fast, before loading config, caches or scopes
+        queries = read_queries(args)
+        if not queries:
+            raise SystemExit("Error: A query must be provided when dorking scopes.")
 
+    from config import ConfigFactory
+
+    config = ConfigFactory.get_config()
+    auth_header = _build_auth_header(config)
+    miner, scope_cache = (None, None) if args.input_scopes else build_miner(args, config, metrics)
+
+    try:
+        if args.serve:
+            # The daemon saves the scope cache after every job
+            serve(args, config, miner, auth_header, scope_cache, metrics)
+            return
+
+        program_scopes = metrics.time_iter(iter_program_scopes(args, miner, auth_header), "stage_seconds_total", stage="scopes")
         if args.output_scopes:
             output_program_scopes(args, program_scopes)
         else:
-            generate_dorks(args, program_scopes, dorker)
+            dork_programs(args, queries, program_scopes, config, metrics)
     finally:
-        config.write_search_count()
+        # Keep every scope mined so far, even when dorking fails
+        if scope_cache is not None:
+            scope_cache.save()
 
 
 if __name__ == "__main__":
     main()
-
@@ -1,4 +1,63 @@
-from .h1_scope_miner import H1ScopeMiner
-from .program_scope import ProgramScope
+from __future__ import annotations
 
-__all__ = ["H1ScopeMiner", "ProgramScope"]
\ No newline at end of file
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .bounty_targets_miner import BountyTargetsScopeMiner
+    from .domain_trie import DomainTrie
+    from .domains import normalise_domain
+    from .h1_scope_miner import H1ScopeMiner
+    from .program_scope import FrozenProgramScope, ProgramScope
+    from .scope_cache import ScopeCache
+    from .scope_compactor import ScopeCompactor
+    from .scope_file import read_scope_file, write_scope_file
+    from .scope_matcher import ScopeMatcher
+    from .scope_miner import ScopeMiner
+    from .shard import Shard
+
+# Public name -> defining submodule, imported on first use so that only the
+# miner actually needed (and its HTTP dependencies) gets loaded
+_EXPORTS = {
+    "BountyTargetsScopeMiner": ".bounty_targets_miner",
+    "DomainTrie": ".domain_trie",
+    "FrozenProgramScope": ".program_scope",
+    "H1ScopeMiner": ".h1_scope_miner",
+    "ProgramScope": ".program_scope",
+    "ScopeCache": ".scope_cache",
+    "ScopeCompactor": ".scope_compactor",
+    "ScopeMatcher": ".scope_matcher",
+    "ScopeMiner": ".scope_miner",
+    "Shard": ".shard",
+    "normalise_domain": ".domains",
+    "read_scope_file": ".scope_file",
+    "write_scope_file": ".scope_file",
+}
+
+__all__ = [
+    "BountyTargetsScopeMiner",
+    "DomainTrie",
+    "FrozenProgramScope",
+    "H1ScopeMiner",
+    "ProgramScope",
+    "ScopeCache",
+    "ScopeCompactor",
+    "ScopeMatcher",
+    "ScopeMiner",
+    "Shard",
+    "normalise_domain",
+    "read_scope_file",
+    "write_scope_file",
+]
+
+
+def __getattr__(name: str) -> object:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *_EXPORTS})
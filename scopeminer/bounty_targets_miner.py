@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import json
+import re
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from .domains import normalise_domain
+from .program_scope import FrozenProgramScope, ProgramScope
+from .scope_file import iter_json_values
+from .scope_miner import ScopeMiner
+
+# Dump file name prefix -> (platform name, target types that are web assets)
+PLATFORMS = {
+    "hackerone": ("HackerOne", {"URL", "WILDCARD"}),
+    "bugcrowd": ("Bugcrowd", {"website", "api"}),
+    "intigriti": ("Intigriti", {"url", "wildcard"}),
+    "yeswehack": ("YesWeHack", {"web-application", "api", "wildcard"}),
+}
+
+# What's left after normalising must be a plain (optionally wildcard) host name
+_DOMAIN_RE = re.compile(r"^\.?[a-z0-9_-]+(\.[a-z0-9_-]+)+$")
+
+
+class BountyTargetsScopeMiner(ScopeMiner):
+    """
+    Mine program scopes from local bounty-targets-data style dumps instead of an API.
+
+    Each dump is a JSON array of programs (``hackerone_data.json``,
+    ``bugcrowd_data.json``, ``intigriti_data.json`` or ``yeswehack_data.json``)
+    and is streamed one program at a time. The platform is taken from the
+    file name, or ``platform`` when given. In-scope web targets are
+    normalised with the same rules as ``H1ScopeMiner``; anything that isn't a
+    host name afterwards (IP ranges, app store ids, free text) is skipped.
+    ``include_oos=False`` keeps only targets eligible for a bounty.
+    """
+
+    def __init__(self, paths: Iterable[Path], platform: str | None = None) -> None:
+        self._dumps = [(Path(path), self.__detect_platform(Path(path), platform)) for path in paths]
+
+    @staticmethod
+    def __detect_platform(path: Path, platform: str | None) -> str:
+        key = (platform or path.name.split("_", 1)[0]).lower()
+        if key not in PLATFORMS:
+            raise SystemExit(
+                f"Unknown scope dump platform for {path}, expected one of: {', '.join(PLATFORMS)}"
+            )
+        return key
+
+    @staticmethod
+    def __program_name(platform: str, program: dict) -> str:
+        if platform == "bugcrowd":
+            # e.g. https://bugcrowd.com/engagements/acme -> acme
+            return (program.get("url") or program.get("name", "")).rstrip("/").rsplit("/", 1)[-1]
+        if platform == "yeswehack":
+            return program.get("id") or program.get("name", "")
+        return program.get("handle") or program.get("name", "")
+
+    @staticmethod
+    def __offers_bounties(platform: str, program: dict) -> bool:
+        if platform == "hackerone":
+            return program.get("submission_state") == "open" and bool(program.get("offers_bounties"))
+        if platform == "bugcrowd":
+            return (program.get("max_payout") or 0) > 0
+        if platform == "intigriti":
+            max_bounty = program.get("max_bounty") or {}
+            return (max_bounty.get("value", 0) if isinstance(max_bounty, dict) else max_bounty) > 0
+        return not program.get("disabled") and (program.get("max_bounty") or 0) > 0
+
+    @staticmethod
+    def __target_asset(platform: str, target: dict) -> tuple[str, bool] | None:
+        """Return ``(identifier, eligible for bounty)`` for a web target, or ``None``."""
+        if platform == "hackerone":
+            asset_type, identifier = target.get("asset_type"), target.get("asset_identifier")
+            eligible = bool(target.get("eligible_for_bounty"))
+        elif platform == "intigriti":
+            asset_type, identifier = target.get("type"), target.get("endpoint")
+            eligible = True
+        else:
+            asset_type, identifier = target.get("type"), target.get("target")
+            eligible = True
+        if asset_type not in PLATFORMS[platform][1] or not identifier:
+            return None
+        return identifier, eligible
+
+    def __to_program_scope(self, platform: str, program: dict, include_oos: bool) -> ProgramScope:
+        assets = set()
+        for target in (program.get("targets") or {}).get("in_scope") or []:
+            target_asset = self.__target_asset(platform, target)
+            if target_asset is None:
+                continue
+            identifier, eligible = target_asset
+            if not include_oos and not eligible:
+                continue
+            # Some platforms list several hosts in one target
+            for part in re.split(r"[\s,]+", identifier):
+                domain = normalise_domain(part)
+                if _DOMAIN_RE.match(domain):
+                    assets.add(domain)
+        return FrozenProgramScope(
+            platform=PLATFORMS[platform][0],
+            name=self.__program_name(platform, program),
+            url_assets=assets,
+        )
+
+    def __iter_scopes(
+        self,
+        include_oos: bool,
+        handles: Iterable[str] | None = None,
+    ) -> Iterator[ProgramScope]:
+        """
+        Stream every program in the dumps, or only those named in ``handles``.
+
+        Without ``handles`` only programs open for bounty submissions are
+        returned, matching ``H1ScopeMiner.get_all_scopes``.
+        """
+        wanted = set(handles) if handles is not None else None
+        for path, platform in self._dumps:
+            try:
+                with path.open("r", encoding="utf-8") as file_handle:
+                    for program in iter_json_values(file_handle):
+                        if not isinstance(program, dict):
+                            continue
+                        name = self.__program_name(platform, program)
+                        if wanted is not None:
+                            if name not in wanted:
+                                continue
+                        elif not self.__offers_bounties(platform, program):
+                            continue
+                        yield self.__to_program_scope(platform, program, include_oos)
+            except OSError as exc:
+                raise SystemExit(f"Error reading scope dump {path}: {exc}")
+            except json.JSONDecodeError as exc:
+                raise SystemExit(f"Error parsing scope dump {path}: {exc}")
+
+    def get_program_scopes(self, authz: str, handle: str, include_oos: bool) -> ProgramScope:
+        for prog_scope in self.__iter_scopes(include_oos, handles=[handle]):
+            return prog_scope
+        raise SystemExit(f"Program '{handle}' not found")
+
+    def iter_program_scopes(self, authz: str, handles: list[str], include_oos: bool) -> Iterator[ProgramScope]:
+        # One pass over the dumps rather than one per handle
+        return self.__iter_scopes(include_oos, handles=handles)
+
+    def iter_all_scopes(self, authz: str, include_oos: bool, ordered: bool = False) -> Iterator[ProgramScope]:
+        # Dumps are always read in file order
+        return self.__iter_scopes(include_oos)
+
+    def get_all_scopes(self, authz: str, include_oos: bool) -> list[ProgramScope]:
+        return list(self.__iter_scopes(include_oos))
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from typing import Any, Iterator
+
+
+class _TrieNode:
+    __slots__ = ("children", "exact", "wildcard")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _TrieNode] = {}
+        self.exact: Any = None
+        self.wildcard: Any = None
+
+
+class DomainTrie:
+    """
+    Trie of scope assets keyed on reversed domain labels.
+
+    ``api.example.com`` is stored under ``com -> example -> api``. Plain
+    assets (``example.com``) are recorded as *exact* entries on their node,
+    wildcard assets (``.example.com``, normalised from ``*.example.com``) as
+    *wildcard* entries. Every operation is O(number of labels).
+    """
+
+    def __init__(self) -> None:
+        self._root = _TrieNode()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @staticmethod
+    def _split(asset: str) -> tuple[list[str], bool]:
+        wildcard = asset.startswith(".")
+        labels = asset.strip(".").split(".")
+        labels.reverse()
+        return labels, wildcard
+
+    def insert(self, asset: str, value: Any = True) -> None:
+        """Store ``value`` for ``asset``; a later insert of the same asset replaces it."""
+        labels, wildcard = self._split(asset)
+        node = self._root
+        for label in labels:
+            node = node.children.setdefault(label, _TrieNode())
+        if wildcard:
+            if node.wildcard is None:
+                self._size += 1
+            node.wildcard = value
+        else:
+            if node.exact is None:
+                self._size += 1
+            node.exact = value
+
+    def _walk(self, asset: str) -> Iterator[tuple[_TrieNode, bool]]:
+        """Yield each node on the path of ``asset`` and whether it is the asset's own node."""
+        labels, _ = self._split(asset)
+        node = self._root
+        last = len(labels) - 1
+        for depth, label in enumerate(labels):
+            node = node.children.get(label)
+            if node is None:
+                return
+            yield node, depth == last
+
+    def is_covered(self, asset: str) -> bool:
+        """
+        Return whether another entry already covers ``asset`` for ``site:`` searches.
+
+        ``site:example.com`` matches the domain and every subdomain, so an exact
+        entry covers its own wildcard and anything below it; a wildcard entry
+        covers everything strictly below it.
+        """
+        _, wildcard = self._split(asset)
+        for node, is_own in self._walk(asset):
+            if not is_own:
+                if node.exact is not None or node.wildcard is not None:
+                    return True
+            elif wildcard and node.exact is not None:
+                return True
+        return False
+
+    def matches(self, host: str) -> Iterator[tuple[str, Any]]:
+        """
+        Yield ``(asset, value)`` for every entry whose scope contains ``host``.
+
+        Exact entries match their own host and its subdomains, wildcard entries
+        match strict subdomains only.
+        """
+        labels, _ = self._split(host)
+        node = self._root
+        last = len(labels) - 1
+        domain = ""
+        for depth, label in enumerate(labels):
+            node = node.children.get(label)
+            if node is None:
+                return
+            domain = f"{label}.{domain}" if domain else label
+            if node.exact is not None:
+                yield domain, node.exact
+            if node.wildcard is not None and depth < last:
+                yield f".{domain}", node.wildcard
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+
+def normalise_domain(domain: str) -> str:
+    """
+    Reduce a scope asset to the host part used in ``site:`` operators.
+
+    Schemes, paths, credentials and ports are stripped and the host is
+    lower-cased; a leading ``*.`` wildcard becomes a leading dot
+    (``*.example.com`` -> ``.example.com``).
+    """
+    domain = domain.strip()
+    if not domain:
+        return ""
+
+    candidate = domain
+    if "://" in candidate:
+        candidate = candidate.split("://", 1)[1]
+    if "/" in candidate:
+        candidate = candidate.split("/", 1)[0]
+    if "@" in candidate:
+        candidate = candidate.split("@", 1)[1]
+    if ":" in candidate:
+        candidate = candidate.split(":", 1)[0]
+
+    candidate = candidate.rstrip(".").lower()
+    if candidate.startswith("*."):
+        return f".{candidate[2:]}"
+
+    return candidate
@@ -1,76 +1,156 @@
+from __future__ import annotations
+
+import time
 import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+from typing import Iterator
 from requests.adapters import HTTPAdapter, Retry
+from metrics import MetricsRegistry
 
+from .domains import normalise_domain
 from .scope_miner import ScopeMiner
 from .program_scope import ProgramScope
+from .scope_cache import CachedScope, ScopeCache
+from .shard import Shard
 
-PROGRAMS_ENPOINT = "https://api.hackerone.com/v1/hackers/programs"
-PROGRAMS_API_URL = f"{PROGRAMS_ENPOINT}?page%5Bsize%5D=100"
+H1_API_URL = "https://api.hackerone.com/v1"
+DEFAULT_MAX_WORKERS = 8
 
 class H1ScopeMiner(ScopeMiner):
-    def __normalise_domain(self, domain: str) -> str:
-        domain = domain.strip()
-        if not domain:
-            return ""
-
-        candidate = domain
-        if "://" in candidate:
-            candidate = candidate.split("://", 1)[1]
-        if "/" in candidate:
-            candidate = candidate.split("/", 1)[0]
-        if "@" in candidate:
-            candidate = candidate.split("@", 1)[1]
-        if ":" in candidate:
-            candidate = candidate.split(":", 1)[0]
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        cache: ScopeCache | None = None,
+        metrics: MetricsRegistry | None = None,
+        api_url: str | None = None,
+        shard: Shard | None = None,
+    ) -> None:
+        self._max_workers = max(1, max_workers)
+        # Overridable so the miner can run against a local stand-in of the API
+        self._programs_endpoint = f"{(api_url or H1_API_URL).rstrip('/')}/hackers/programs"
+        self._cache = cache
+        self._metrics = metrics if metrics is not None else MetricsRegistry()
+        # Only this shard's programs are mined; the cached handle list stays complete
+        self._shard = shard
+        self._session = self.__build_session()
 
-        candidate = candidate.rstrip(".").lower()
-        if candidate.startswith("*."):
-            return f".{candidate[2:]}"
+    def __build_session(self) -> requests.Session:
+        """Build one pooled session shared by every worker thread.
 
-        return candidate
+        429 and transient 5xx responses are retried, sleeping for the
+        ``Retry-After`` header when HackerOne sends one.
+        """
+        s = requests.Session()
+        retries = Retry(
+            total=5,
+            backoff_factor=2,
+            status_forcelist=[429, 500, 502, 503, 504],
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            max_retries=retries,
+            pool_connections=1,
+            pool_maxsize=self._max_workers,
+        )
+        s.mount("https://", adapter)
+        s.mount("http://", adapter)
+        return s
 
+    def __get(self, url: str, headers: dict[str, str], endpoint: str) -> requests.Response:
+        """GET ``url`` on the shared session, recording latency, status and retries."""
+        started = time.monotonic()
+        res = self._session.get(url, headers=headers)
+        self._metrics.observe("h1_request_seconds", time.monotonic() - started, endpoint=endpoint)
+        self._metrics.inc("h1_requests_total", endpoint=endpoint, status=res.status_code)
+        # urllib3 records every retry it made for this request
+        retries = getattr(getattr(getattr(res, "raw", None), "retries", None), "history", ())
+        if retries:
+            self._metrics.inc("h1_retries_total", len(retries), endpoint=endpoint)
+        return res
 
     def __get_program_scopes(self, authz: str, handle: str, include_oos: bool) -> ProgramScope:
-        program_scopes = set()
-        current_url = f"https://api.hackerone.com/v1/hackers/programs/{handle}/structured_scopes?page%5Bnumber%5D=1&page%5Bsize%5D=100"
-        s = requests.Session()
-        retries = Retry(total=3, backoff_factor=2)
-        s.mount("https://", HTTPAdapter(max_retries=retries))
+        cached = self._cache.get(handle) if self._cache else None
+        if cached is not None and self._cache.is_fresh(cached):
+            self._metrics.inc("h1_scope_cache_total", result="fresh")
+            return cached.to_program_scope(include_oos)
+
+        all_assets = set()
+        eligible_assets = set()
+        last_updated = None
+        etag = None
+        current_url = f"{self._programs_endpoint}/{handle}/structured_scopes?page%5Bnumber%5D=1&page%5Bsize%5D=100"
+        headers = {"Authorization": f"Basic {authz}"}
+        if cached is not None and cached.etag:
+            headers["If-None-Match"] = cached.etag
+        first_page = True
         while True:
-            res = s.get(current_url, headers={"Authorization": f"Basic {authz}"})
+            res = self.__get(current_url, headers, "structured_scopes")
 
-            if res.status_code == 401:
+            if res.status_code == 304 and cached is not None:
+                # Stale entry revalidated, nothing changed on HackerOne's side
+                self._cache.touch(cached)
+                self._metrics.inc("h1_scope_cache_total", result="revalidated")
+                return cached.to_program_scope(include_oos)
+            elif res.status_code == 401:
                 user_home = Path.home()
                 config_dir = user_home / ".config/scope-dorker"
                 config_path = config_dir / "config.json"
                 raise SystemExit(f"Failed to get scopes for program check API keys configured in {config_path}")
             elif res.status_code == 404:
                 raise SystemExit(f"Program '{handle}' not found")
+            elif res.status_code != 200:
+                raise SystemExit(f"Failed to get scopes for program '{handle}': {res.status_code} {res.text}")
 
             data = res.json()
             scopes = data.get("data", [])
             for scope in scopes:
                 attributes = scope.get("attributes", {})
+                updated_at = attributes.get("updated_at")
+                if updated_at and (last_updated is None or updated_at > last_updated):
+                    last_updated = updated_at
                 if "asset_type" in attributes and "URL" == attributes["asset_type"]:
                     asset_identifier = attributes.get("asset_identifier", "")
-                    normalised_domain = self.__normalise_domain(asset_identifier)
-                    if include_oos:
-                        program_scopes.add(normalised_domain)
-                    elif "eligible_for_bounty" in attributes and attributes["eligible_for_bounty"]:
-                        program_scopes.add(normalised_domain)
+                    normalised_domain = normalise_domain(asset_identifier)
+                    all_assets.add(normalised_domain)
+                    if "eligible_for_bounty" in attributes and attributes["eligible_for_bounty"]:
+                        eligible_assets.add(normalised_domain)
             links = data.get("links", {})
             current_url = links.get("next")
+            if first_page:
+                # An ETag only describes the whole scope when it fits on one page
+                etag = res.headers.get("ETag") if not current_url else None
+                headers.pop("If-None-Match", None)
+                first_page = False
             if not current_url:
                 break
 
+        self._metrics.inc("h1_scope_cache_total", result="miss")
+        if cached is not None and (
+            last_updated != cached.last_updated or all_assets != set(cached.scope.get_url_assets())
+        ):
+            # Stale entry re-mined, and the program was edited since it was cached
+            self._metrics.inc("h1_scope_changes_total")
+        if self._cache is not None:
+            self._cache.put(
+                CachedScope(
+                    scope=ProgramScope(platform="HackerOne", name=handle, url_assets=set(all_assets)),
+                    eligible_assets=set(eligible_assets),
+                    fetched_at=time.time(),
+                    etag=etag,
+                    last_updated=last_updated,
+                )
+            )
+
+        program_scopes = all_assets if include_oos else eligible_assets
         return ProgramScope(platform="HackerOne", name=handle, url_assets=program_scopes)
 
     def __get_program_handles(self, authz: str) -> list[str]:
         handles = []
-        current_url = PROGRAMS_API_URL
+        current_url = f"{self._programs_endpoint}?page%5Bsize%5D=100"
         while True:
-            res = requests.get(current_url, headers={"Authorization": f"Basic {authz}"})
+            res = self.__get(current_url, {"Authorization": f"Basic {authz}"}, "programs")
             if res.status_code == 401:
                 user_home = Path.home()
                 config_dir = user_home / ".config/scope-dorker"
@@ -97,11 +177,31 @@ class H1ScopeMiner(ScopeMiner):
     def get_program_scopes(self, authz: str, handle: str, include_oos: bool) -> ProgramScope:
         return self.__get_program_scopes(authz, handle, include_oos)
 
+    def __get_all_handles(self, authz: str) -> list[str]:
+        program_handles = self._cache.get_handles() if self._cache else None
+        if program_handles is None:
+            program_handles = self.__get_program_handles(authz)
+            if self._cache is not None:
+                self._cache.put_handles(program_handles)
+        if self._shard is not None:
+            program_handles = self._shard.filter_names(program_handles)
+        return program_handles
+
+    def iter_all_scopes(self, authz: str, include_oos: bool, ordered: bool = False) -> Iterator[ProgramScope]:
+        program_handles = self.__get_all_handles(authz)
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            futures = [
+                executor.submit(self.__get_program_scopes, authz, handle, include_oos)
+                for handle in program_handles
+            ]
+            try:
+                # Handle order waits on the slowest earlier program but is reproducible
+                for future in futures if ordered else as_completed(futures):
+                    yield future.result()
+            finally:
+                # Stop mining if the consumer gives up early
+                for future in futures:
+                    future.cancel()
+
     def get_all_scopes(self, authz: str, include_oos: bool) -> list[ProgramScope]:
-        all_scopes = list()
-        program_handles = self.__get_program_handles(authz)
-        for handle in program_handles:
-            program_scopes = self.__get_program_scopes(authz, handle, include_oos)
-            all_scopes.append(program_scopes)
-        return all_scopes
-    
\ No newline at end of file
+        return list(self.iter_all_scopes(authz, include_oos, ordered=True))
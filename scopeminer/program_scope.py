@@ -1,29 +1,41 @@
 from __future__ import annotations
 
+from typing import Iterable
+
 class ProgramScope:
+    __slots__ = ("_platform", "_name", "_url_assets", "_sorted_assets")
     
     def __init__(self, platform: str, name: str, url_assets: set[str]) -> None:
         self._platform = platform
         self._name = name
         self._url_assets = url_assets
+        # Sorted once on first use and reused until the assets change
+        self._sorted_assets: tuple[str, ...] | None = None
    
     def get_name(self) -> str:
         return self._name
         
     def get_url_assets(self) -> list[str]:
-        return sorted(list(self._url_assets))
+        return list(self.get_sorted_url_assets())
+    
+    def get_sorted_url_assets(self) -> tuple[str, ...]:
+        """The assets in sorted order, without copying."""
+        if self._sorted_assets is None:
+            self._sorted_assets = tuple(sorted(self._url_assets))
+        return self._sorted_assets
     
     def get_platform(self) -> str:
         return self._platform
     
     def add_url_asset(self, asset: str) -> None:
         self._url_assets.add(asset)
+        self._sorted_assets = None
     
     def to_json_dict(self) -> dict:
         return {
             "platform": self._platform,
             "name": self._name,
-            "url_assets": sorted(list(self._url_assets)),
+            "url_assets": list(self.get_sorted_url_assets()),
         }
         
     @classmethod
@@ -46,4 +58,35 @@ class ProgramScope:
              raise ValueError("JSON data is missing required fields: 'platform' or 'name'")
              
         # Create and return the new object instance
-        return cls(platform=platform, name=name, url_assets=url_assets_set)
\ No newline at end of file
+        return cls(platform=platform, name=name, url_assets=url_assets_set)
+
+
+class FrozenProgramScope(ProgramScope):
+    """
+    Immutable ProgramScope holding its assets as a single sorted tuple.
+
+    Uses less memory than a ProgramScope (no set is kept alongside the
+    sorted assets) and never re-sorts, which suits large scope files and
+    dumps that are only read.
+    """
+    __slots__ = ()
+
+    def __init__(self, platform: str, name: str, url_assets: Iterable[str]) -> None:
+        sorted_assets = tuple(sorted(set(url_assets)))
+        super().__init__(platform, name, sorted_assets)
+        self._sorted_assets = sorted_assets
+
+    def add_url_asset(self, asset: str) -> None:
+        raise TypeError("FrozenProgramScope is immutable")
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, FrozenProgramScope):
+            return NotImplemented
+        return (self._platform, self._name, self._sorted_assets) == (
+            other._platform,
+            other._name,
+            other._sorted_assets,
+        )
+
+    def __hash__(self) -> int:
+        return hash((self._platform, self._name, self._sorted_assets))
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from pathlib import Path
+from threading import Lock
+from typing import Any
+
+from .program_scope import ProgramScope
+
+CACHE_VERSION = 1
+
+
+class CachedScope:
+    """A cached program scope plus the metadata recorded when it was fetched."""
+
+    def __init__(
+        self,
+        scope: ProgramScope,
+        eligible_assets: set[str],
+        fetched_at: float,
+        etag: str | None = None,
+        last_updated: str | None = None,
+    ) -> None:
+        self.scope = scope
+        self.eligible_assets = eligible_assets
+        self.fetched_at = fetched_at
+        self.etag = etag
+        self.last_updated = last_updated
+
+    def to_program_scope(self, include_oos: bool) -> ProgramScope:
+        assets = self.scope.get_url_assets() if include_oos else self.eligible_assets
+        return ProgramScope(
+            platform=self.scope.get_platform(),
+            name=self.scope.get_name(),
+            url_assets=set(assets),
+        )
+
+    def to_json_dict(self) -> dict:
+        return {
+            "scope": self.scope.to_json_dict(),
+            "eligible_assets": sorted(self.eligible_assets),
+            "fetched_at": self.fetched_at,
+            "etag": self.etag,
+            "last_updated": self.last_updated,
+        }
+
+    @classmethod
+    def from_json_data(cls, json_data: dict) -> CachedScope:
+        return cls(
+            scope=ProgramScope.from_json_data(json_data["scope"]),
+            eligible_assets=set(json_data.get("eligible_assets", [])),
+            fetched_at=float(json_data.get("fetched_at", 0)),
+            etag=json_data.get("etag"),
+            last_updated=json_data.get("last_updated"),
+        )
+
+
+class ScopeCache:
+    """
+    Persistent cache of mined program scopes.
+
+    Entries younger than ``max_age_seconds`` are served without touching the
+    API. Older entries are revalidated by the miner (conditional request using
+    the stored ETag where possible) and refreshed only when they changed.
+    ``refresh=True`` ignores every stored entry but still rewrites the cache.
+    """
+
+    def __init__(self, path: Path, max_age_seconds: float, refresh: bool = False) -> None:
+        self._path = path
+        self._max_age_seconds = max_age_seconds
+        self._refresh = refresh
+        self._lock = Lock()
+        self._dirty = False
+        self._handles: list[str] = []
+        self._handles_fetched_at = 0.0
+        self._programs: dict[str, CachedScope] = {}
+        self._load()
+
+    def _load(self) -> None:
+        if not self._path.exists():
+            return
+        try:
+            with self._path.open("r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            # A corrupt cache is simply rebuilt on the next save
+            return
+        if data.get("version") != CACHE_VERSION:
+            return
+
+        handles = data.get("handles", {})
+        self._handles = list(handles.get("items", []))
+        self._handles_fetched_at = float(handles.get("fetched_at", 0))
+        for handle, entry in data.get("programs", {}).items():
+            try:
+                self._programs[handle] = CachedScope.from_json_data(entry)
+            except (KeyError, ValueError):
+                continue
+
+    def _is_fresh(self, fetched_at: float) -> bool:
+        return not self._refresh and time.time() - fetched_at < self._max_age_seconds
+
+    def get_handles(self) -> list[str] | None:
+        """Return the cached program handle list if it is still fresh."""
+        with self._lock:
+            if self._handles and self._is_fresh(self._handles_fetched_at):
+                return list(self._handles)
+        return None
+
+    def put_handles(self, handles: list[str]) -> None:
+        with self._lock:
+            self._handles = list(handles)
+            self._handles_fetched_at = time.time()
+            self._dirty = True
+
+    def get(self, handle: str) -> CachedScope | None:
+        """Return the cached entry for ``handle``, fresh or not (``None`` when forcing a refresh)."""
+        if self._refresh:
+            return None
+        with self._lock:
+            return self._programs.get(handle)
+
+    def is_fresh(self, entry: CachedScope) -> bool:
+        return self._is_fresh(entry.fetched_at)
+
+    def put(self, entry: CachedScope) -> None:
+        with self._lock:
+            self._programs[entry.scope.get_name()] = entry
+            self._dirty = True
+
+    def touch(self, entry: CachedScope) -> None:
+        """Mark an entry as revalidated (e.g. after a ``304 Not Modified``)."""
+        with self._lock:
+            entry.fetched_at = time.time()
+            self._dirty = True
+
+    def save(self) -> None:
+        """Atomically write the cache back to disk if anything changed."""
+        with self._lock:
+            if not self._dirty:
+                return
+            data: dict[str, Any] = {
+                "version": CACHE_VERSION,
+                "handles": {
+                    "fetched_at": self._handles_fetched_at,
+                    "items": self._handles,
+                },
+                "programs": {
+                    handle: entry.to_json_dict()
+                    for handle, entry in sorted(self._programs.items())
+                },
+            }
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self._path.with_suffix(self._path.suffix + ".tmp")
+            with tmp_path.open("w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self._path)
+            self._dirty = False
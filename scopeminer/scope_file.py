@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Iterable, Iterator, TextIO
+
+from .program_scope import FrozenProgramScope, ProgramScope
+
+READ_CHUNK_SIZE = 1 << 16
+
+
+def iter_json_values(file_handle: TextIO, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[Any]:
+    """
+    Yield the elements of a top-level JSON array, or a stream of JSON values, one at a time.
+
+    The file is read in ``chunk_size`` pieces and decoded with
+    ``JSONDecoder.raw_decode``, so only the element being decoded is held in
+    memory rather than the whole document.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    eof = False
+    in_array = None
+
+    while True:
+        # Skip whitespace and the separators between array elements
+        while position < len(buffer) and buffer[position] in " \t\r\n,":
+            position += 1
+        if position == len(buffer):
+            if eof:
+                return
+            buffer = file_handle.read(chunk_size)
+            position = 0
+            eof = not buffer
+            continue
+
+        if in_array is None:
+            in_array = buffer[position] == "["
+            if in_array:
+                position += 1
+            continue
+        if in_array and buffer[position] == "]":
+            return
+
+        try:
+            value, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            # The value continues in the next chunk
+            chunk = file_handle.read(chunk_size)
+            eof = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        if end == len(buffer) and not eof:
+            # A number may have been cut off mid-digit; decode it again with more input
+            chunk = file_handle.read(chunk_size)
+            if chunk:
+                buffer = buffer[position:] + chunk
+                position = 0
+                continue
+            eof = True
+        yield value
+        position = end
+
+
+def read_scope_file(path: Path) -> Iterator[FrozenProgramScope]:
+    """
+    Stream program scopes from a scope file.
+
+    Both the JSONL format (one program per line) and the older indented JSON
+    array written by ``--output-scopes`` are read incrementally, one program
+    at a time.
+    """
+    try:
+        with path.open("r", encoding="utf-8") as file_handle:
+            for json_data in iter_json_values(file_handle):
+                yield FrozenProgramScope.from_json_data(json_data)
+    except OSError as exc:
+        raise SystemExit(f"Error reading input scopes from {path}: {exc}")
+    except (json.JSONDecodeError, ValueError, AttributeError) as exc:
+        raise SystemExit(f"Error parsing input scopes from {path}: {exc}")
+
+
+def write_scope_file(path: Path, prog_scopes: Iterable[ProgramScope]) -> int:
+    """
+    Stream program scopes to ``path`` and return how many were written.
+
+    Files ending in ``.jsonl`` get one compact JSON object per line; any
+    other name gets the indented JSON array written by earlier versions.
+    The file is written next to ``path`` and moved into place at the end, so
+    an interrupted run never leaves a truncated scope file behind.
+    """
+    jsonl = path.suffix == ".jsonl"
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    count = 0
+    try:
+        with tmp_path.open("w", encoding="utf-8") as file_handle:
+            if not jsonl:
+                file_handle.write("[")
+            for prog_scope in prog_scopes:
+                json_data = prog_scope.to_json_dict()
+                if jsonl:
+                    file_handle.write(json.dumps(json_data) + "\n")
+                else:
+                    separator = "," if count else ""
+                    indented = json.dumps(json_data, indent=4).replace("\n", "\n    ")
+                    file_handle.write(f"{separator}\n    {indented}")
+                count += 1
+            if not jsonl:
+                file_handle.write("\n]" if count else "]")
+        os.replace(tmp_path, path)
+    except OSError as exc:
+        raise SystemExit(f"Error writing output scopes to {path}: {exc}")
+    return count
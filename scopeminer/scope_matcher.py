@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import re
+from typing import Iterable
+
+from .domain_trie import DomainTrie
+from .program_scope import ProgramScope
+
+# Host of an absolute URL, skipping any credentials; far cheaper than urlsplit
+# on large result sets
+_HOST_RE = re.compile(r"[a-zA-Z][a-zA-Z0-9+.-]*://(?:[^@/?#]*@)?([^:/?#]+)")
+
+
+class ScopeMatcher:
+    """
+    Precompiled program scopes for classifying result links by the asset they fall under.
+
+    Exact assets live in a hash map and wildcards (``.example.com``) in a
+    ``DomainTrie``, so each link is classified in O(number of labels)
+    however large the scope; hosts are memoised, as results repeat them a
+    lot. Matching follows scope rules rather than ``site:`` rules: an exact
+    asset covers its own host (and its ``www.`` form), a wildcard covers
+    every subdomain below it, so subdomains that ``site:example.com``
+    returns are only in scope when a wildcard covers them.
+
+    One matcher can hold many programs' scopes; a link is attributed to
+    every program whose scope contains it, under that program's most
+    specific asset.
+    """
+
+    def __init__(self, prog_scopes: Iterable[ProgramScope] = ()) -> None:
+        self._exact: dict[str, list[str]] = {}
+        self._wildcards = DomainTrie()
+        self._wildcard_owners: dict[str, list[str]] = {}
+        self._host_matches: dict[str, dict[str, str]] = {}
+        for prog_scope in prog_scopes:
+            self.add_scope(prog_scope)
+
+    def add_scope(self, prog_scope: ProgramScope) -> None:
+        for asset in prog_scope.get_sorted_url_assets():
+            self.add(asset, prog_scope.get_name())
+
+    def add(self, asset: str, owner: str) -> None:
+        """Put ``asset`` (normalised, wildcards with a leading dot) in scope for ``owner``."""
+        if asset.startswith("."):
+            owners = self._wildcard_owners.setdefault(asset, [])
+            if not owners:
+                self._wildcards.insert(asset, owners)
+        else:
+            owners = self._exact.setdefault(asset, [])
+        if owner not in owners:
+            owners.append(owner)
+        self._host_matches.clear()
+
+    def match_host(self, host: str) -> dict[str, str]:
+        """
+        Map each program whose scope contains ``host`` to its most specific asset covering it.
+
+        An exact asset wins over any wildcard, and a deeper wildcard over a
+        shallower one. Returns an empty dict when ``host`` is out of scope.
+        """
+        matches = self._host_matches.get(host)
+        if matches is not None:
+            return matches
+        normalised = host.rstrip(".").lower()
+        matches = {}
+        # Shallowest first, so deeper wildcards overwrite shallower ones
+        for asset, owners in self._wildcards.matches(normalised):
+            for owner in owners:
+                matches[owner] = asset
+        exact = normalised
+        if exact not in self._exact and exact.startswith("www."):
+            exact = exact[4:]
+        for owner in self._exact.get(exact, ()):
+            matches[owner] = exact
+        self._host_matches[host] = matches
+        return matches
+
+    def match_link(self, link: str) -> dict[str, str]:
+        """``match_host`` for the host of ``link``; empty when it has none."""
+        match = _HOST_RE.match(link)
+        return self.match_host(match.group(1)) if match else {}
+
+    def group_links(self, links: Iterable[str], owner: str) -> tuple[dict[str, set[str]], set[str]]:
+        """Split ``links`` into those in ``owner``'s scope, keyed by the asset covering them, and the rest."""
+        asset_links: dict[str, set[str]] = {}
+        out_of_scope: set[str] = set()
+        for link in links:
+            asset = self.match_link(link).get(owner)
+            if asset is None:
+                out_of_scope.add(link)
+            else:
+                asset_links.setdefault(asset, set()).add(link)
+        return asset_links, out_of_scope
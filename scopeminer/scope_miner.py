@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import Iterator
 
 from .program_scope import ProgramScope
 
@@ -8,4 +9,16 @@ class ScopeMiner(ABC):
         pass
     @abstractmethod
     def get_all_scopes(self, authz: str, include_oos: bool) -> list[ProgramScope]:
-        pass
\ No newline at end of file
+        pass
+    def iter_program_scopes(self, authz: str, handles: list[str], include_oos: bool) -> Iterator[ProgramScope]:
+        """Yield the scopes of the programs named in ``handles``."""
+        for handle in handles:
+            yield self.get_program_scopes(authz, handle, include_oos)
+    def iter_all_scopes(self, authz: str, include_oos: bool, ordered: bool = False) -> Iterator[ProgramScope]:
+        """
+        Yield program scopes as soon as each one is available.
+
+        They come in no particular order unless ``ordered`` is set, in which
+        case they follow the platform's program listing.
+        """
+        yield from self.get_all_scopes(authz, include_oos)
\ No newline at end of file
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from .program_scope import ProgramScope
+
+
+class Shard:
+    """
+    One of ``count`` disjoint slices of the programs, numbered from 1.
+
+    A program belongs to the shard picked by a SHA-1 hash of its name rather
+    than ``hash()``, which is salted per process, so every machine agrees on
+    the partition however the programs were listed or ordered.
+    """
+
+    def __init__(self, index: int, count: int) -> None:
+        if count < 1:
+            raise ValueError(f"Shard count must be at least 1, got {count}")
+        if not 1 <= index <= count:
+            raise ValueError(f"Shard {index}/{count} is not between 1/{count} and {count}/{count}")
+        self.index = index
+        self.count = count
+
+    @classmethod
+    def parse(cls, text: str) -> Shard:
+        """Parse ``i/N``; raises ``ValueError`` when it is malformed."""
+        index, separator, count = text.partition("/")
+        if not separator or not index.strip().isdigit() or not count.strip().isdigit():
+            raise ValueError(f"Expected a shard as i/N, got '{text}'")
+        return cls(int(index), int(count))
+
+    def __str__(self) -> str:
+        return f"{self.index}/{self.count}"
+
+    def contains(self, name: str) -> bool:
+        digest = hashlib.sha1(name.encode("utf-8")).digest()
+        return int.from_bytes(digest[:8], "big") % self.count == self.index - 1
+
+    def filter_names(self, names: Iterable[str]) -> list[str]:
+        return [name for name in names if self.contains(name)]
+
+    def filter_scopes(self, prog_scopes: Iterable[ProgramScope]) -> Iterator[ProgramScope]:
+        return (prog_scope for prog_scope in prog_scopes if self.contains(prog_scope.get_name()))
+
+    def path_for(self, path: Path) -> Path:
+        """``results.jsonl`` becomes ``results.shard-1-of-4.jsonl``, so shards sharing a directory don't collide."""
+        return path.with_name(f"{path.stem}.shard-{self.index}-of-{self.count}{path.suffix}")